@@ -0,0 +1,270 @@
+import json
+
+from langchain.agents import Tool
+from langchain.output_parsers import StructuredOutputParser
+
+from bots import FailedLookup
+from checkpoint import arun_agent, checkpoint_key, run_agent
+from clients import get_search_client
+from data_manager import get_data_manager
+from metrics import get_metrics
+from metrics_callbacks import MetricsCallbackHandler
+from refresh import describe_fields, field_schemas
+from research import SEARCH_QUERIES, aget_corpus, get_corpus
+from singleflight import single_flight
+from tracing import span, trace_run
+
+
+class AgentBot:
+    """ReAct agent lookup shared by the three bots
+
+    Subclasses provide the category: DATA_TYPE, FIELD_GROUPS, the TASK line
+    and REQUIRED_INFO list of the prompt, _initialize_schema,
+    _initialize_agent, _extract_data_from_steps and _create_fallback_response.
+    """
+
+    # Key of the bot's search query in research.SEARCH_QUERIES
+    DATA_TYPE = None
+    # Each main output field with the fields that describe it
+    FIELD_GROUPS = {}
+    # First line of the agent prompt, followed by ": <satellite name>"
+    TASK = "Find comprehensive information about the satellite"
+    # Numbered list of what to find when every field is requested
+    REQUIRED_INFO = ""
+
+    def __init__(self):
+        self.satellite_data_manager = get_data_manager()
+        self._initialize_tools()
+        self._initialize_schema()
+        self._initialize_parser()
+        self._initialize_agent()
+
+    def _initialize_tools(self):
+        """Initialize the tools for the agent"""
+
+        def complete_task(input_data):
+            """Tool to complete the task and return structured output"""
+            try:
+                # Parse the input as JSON if it's a string
+                if isinstance(input_data, str):
+                    try:
+                        parsed_data = json.loads(input_data)
+                        return json.dumps(parsed_data, indent=2)
+                    except json.JSONDecodeError:
+                        return input_data
+                return json.dumps(input_data, indent=2)
+            except Exception as e:
+                return f"Task completed with data: {input_data}"
+
+        self.tools = [
+            Tool(
+                name="Satellite Data Manager",
+                func=self.satellite_data_manager.get_satellite_data,
+                description="Useful for getting satellite data based on the user's query.",
+            ),
+            Tool(
+                name="Tavily Search",
+                func=get_search_client().run,
+                coroutine=get_search_client().arun,
+                description="Useful for getting information from the web. Returns search results with URLs and content.",
+            ),
+            Tool(
+                name="Complete Task",
+                func=complete_task,
+                description="Use this tool when you have gathered all necessary information and want to provide the final structured output. Input should be the complete satellite information in JSON format."
+            )
+        ]
+
+    def _initialize_parser(self):
+        """Initialize the output parser"""
+        self.output_parser = StructuredOutputParser.from_response_schemas(self.response_schema)
+        self.format_instructions = self.output_parser.get_format_instructions()
+
+    def _create_search_query(self, satellite_name):
+        """Create an effective search query"""
+        return SEARCH_QUERIES[self.DATA_TYPE].format(satellite_name=satellite_name)
+
+    def _create_prompt(self, satellite_name, corpus=None, fields=None):
+        """Create the agent prompt for a satellite, starting from the shared research if available
+
+        With fields (FIELD_GROUPS keys), only those fields are requested.
+        """
+        research = corpus.to_prompt() if corpus else ""
+        if research:
+            research = f"""
+Research already gathered for this satellite (numbered search results with source URLs):
+
+{research}
+
+Use this research first. Only search the web for required information it does not cover.
+"""
+            first_step = "First, review the research above for the required information"
+        else:
+            first_step = f'First, search for "{satellite_name}" using Tavily Search'
+        if fields:
+            schemas = field_schemas(self.response_schema, self.FIELD_GROUPS, fields)
+            required_info = describe_fields(schemas)
+            format_instructions = StructuredOutputParser.from_response_schemas(schemas).get_format_instructions()
+        else:
+            required_info = self.REQUIRED_INFO
+            format_instructions = self.format_instructions
+        return f"""{research}
+{self.TASK}: {satellite_name}
+
+Required information to find:
+{required_info}
+
+Steps to follow:
+1. {first_step}
+2. Analyze the search results for the required information
+3. If needed, perform additional searches for specific details
+4. When you have gathered sufficient information, use the "Complete Task" tool with the data in this exact JSON format:
+
+{format_instructions}
+
+IMPORTANT: 
+- You have a maximum of 10 actions. Use them efficiently.
+- If you cannot find specific information, use "NA" for that field
+- If you're running out of iterations, prioritize the most critical information and use the Complete Task tool
+- Always include source URLs when data is available, otherwise use "NA"
+
+Remember: Use "NA" for any information that cannot be found or verified.
+"""
+
+    def _parse_agent_response(self, response, satellite_name, fields=None):
+        """Turn the agent response into the structured output dict"""
+        output_parser = self.output_parser
+        if fields:
+            output_parser = StructuredOutputParser.from_response_schemas(
+                field_schemas(self.response_schema, self.FIELD_GROUPS, fields)
+            )
+        # Check if response indicates agent limits were reached
+        if isinstance(response, dict):
+            output = response.get("output", "")
+            intermediate_steps = response.get("intermediate_steps", [])
+
+            # Check if agent was stopped due to limits
+            if len(intermediate_steps) >= 10:
+                print("⚠️  Agent reached maximum iterations (10). Processing available data...")
+                # Try to extract any useful information from intermediate steps
+                return self._extract_data_from_steps(intermediate_steps, satellite_name)
+
+            # Normal processing
+            if "```json" in output:
+                # Extract JSON from markdown code block
+                json_start = output.find("```json") + 7
+                json_end = output.find("```", json_start)
+                json_str = output[json_start:json_end].strip()
+                return json.loads(json_str)
+            elif output.startswith("{"):
+                # Direct JSON output
+                try:
+                    return json.loads(output)
+                except json.JSONDecodeError:
+                    pass
+
+            # Try to parse with the structured parser
+            try:
+                return output_parser.parse(output)
+            except Exception:
+                # If parsing fails but we have intermediate steps, try to extract data
+                if intermediate_steps:
+                    return self._extract_data_from_steps(intermediate_steps, satellite_name)
+
+                # Final fallback
+                return self._create_fallback_response("Parsing failed", satellite_name)
+
+        return response
+
+    def _parse_or_fallback(self, response, satellite_name, fields=None):
+        """Parse the agent response; output that can't be parsed becomes a fallback response"""
+        try:
+            with span("parse_output", "parse"):
+                return self._parse_agent_response(response, satellite_name, fields)
+        except Exception as e:
+            print(f"Error parsing agent output: {str(e)}")
+            return self._create_fallback_response(f"Error: {str(e)}", satellite_name)
+
+    def _run_agent(self, satellite_name, corpus=None, fields=None):
+        """Run the agent and parse its output
+
+        Agent errors propagate. Completed steps are checkpointed, so the next
+        lookup of the same satellite and fields resumes from the last one
+        instead of starting over.
+        """
+        prompt_text = self._create_prompt(satellite_name, corpus, fields)
+        response = run_agent(
+            self.agent,
+            {"input": prompt_text},
+            run_key=checkpoint_key(type(self).__name__, satellite_name, fields),
+            callbacks=[MetricsCallbackHandler(type(self).__name__, satellite_name)]
+        )
+        return self._parse_or_fallback(response, satellite_name, fields)
+
+    async def _arun_agent(self, satellite_name, corpus=None, fields=None):
+        """Async version of _run_agent"""
+        prompt_text = self._create_prompt(satellite_name, corpus, fields)
+        response = await arun_agent(
+            self.agent,
+            {"input": prompt_text},
+            run_key=checkpoint_key(type(self).__name__, satellite_name, fields),
+            callbacks=[MetricsCallbackHandler(type(self).__name__, satellite_name)]
+        )
+        return self._parse_or_fallback(response, satellite_name, fields)
+
+    def _empty_output(self):
+        """Output dict with every schema field set to NA"""
+        return {schema.name: "NA" for schema in self.response_schema}
+
+    def _finalize_output(self, parsed_output, satellite_name):
+        """Normalize the parsed output and tag it with the satellite name"""
+        # Ensure parsed_output is a dictionary
+        if not isinstance(parsed_output, dict):
+            parsed_output = FailedLookup(self._empty_output(), "Unexpected agent output")
+
+        # Add the satellite name to the output
+        parsed_output["satellite_name"] = satellite_name
+
+        return parsed_output
+
+    def _error_output(self, e, satellite_name):
+        """Build the output returned when processing fails outright"""
+        print(f"Error processing satellite {satellite_name}: {str(e)}")
+        if "Resource has been exhausted" in str(e):
+            print("API rate limit reached. Please try again in a few minutes.")
+
+        # Return error structure
+        return FailedLookup({"satellite_name": satellite_name, **self._empty_output()}, str(e))
+
+    @single_flight
+    def process_satellite(self, satellite_name, corpus=None, fields=None):
+        """Process satellite information and return parsed output; fields limits it to some FIELD_GROUPS"""
+        with get_metrics().timer(type(self).__name__, satellite_name), trace_run(f"{type(self).__name__} {satellite_name}"):
+            try:
+                print(f"Processing satellite: {satellite_name}")
+
+                # Reuse the research pass shared with the other bots
+                if corpus is None:
+                    corpus = get_corpus(satellite_name)
+            
+                parsed_output = self._run_agent(satellite_name, corpus, fields)
+                return self._finalize_output(parsed_output, satellite_name)
+            
+            except Exception as e:
+                return self._error_output(e, satellite_name)
+
+    @single_flight
+    async def aprocess_satellite(self, satellite_name, corpus=None, fields=None):
+        """Async version of process_satellite for keeping many lookups in flight on one event loop"""
+        with get_metrics().timer(type(self).__name__, satellite_name), trace_run(f"{type(self).__name__} {satellite_name}"):
+            try:
+                print(f"Processing satellite: {satellite_name}")
+
+                if corpus is None:
+                    corpus = await aget_corpus(satellite_name)
+
+                parsed_output = await self._arun_agent(satellite_name, corpus, fields)
+                return self._finalize_output(parsed_output, satellite_name)
+
+            except Exception as e:
+                return self._error_output(e, satellite_name)
@@ -1,22 +1,22 @@
 import streamlit as st
 import json
-from tech import TechAgent
-from basic import BasicInfoBot
-from cost import CostBot
-from data_manager import SatelliteDataManager
-import pandas as pd
-import os
-import sys
-from dotenv import load_dotenv
-import gspread
-from gspread_dataframe import set_with_dataframe
-from google.oauth2.service_account import Credentials
-
-# Load environment variables
-load_dotenv()
-
-# Initialize the data manager
-data_manager = SatelliteDataManager()
+import config
+from bot_pool import get_bot_pool
+from bots import DATA_TYPES
+from data_manager import get_data_manager, name_key
+from export import EXPORT_FORMATS, export_bytes
+from flatten import flatten_record
+from gsheet import SheetUpserter, sync_store
+from jobs import ACTIVE_STATUSES, get_job_runner
+from metrics import get_metrics
+from name_index import FRESHNESS, ORBIT_CLASSES, get_name_index
+import time
+
+# Load environment variables once per process; Streamlit reruns reuse them
+config.load()
+
+# Shared data manager (one per process, safe across sessions)
+data_manager = get_data_manager()
 
 # Set page config
 st.set_page_config(
@@ -25,6 +25,58 @@ st.set_page_config(
     layout="wide"
 )
 
+
+@st.cache_resource
+def get_warm_bot_pool():
+    """Shared bot pool, warmed up in the background once per server process"""
+    pool = get_bot_pool()
+    pool.warm_up(background=True)
+    return pool
+
+
+get_warm_bot_pool()
+
+
+@st.cache_resource
+def get_shared_job_runner():
+    """Background job runner shared by all sessions; resumes jobs left queued by a restart"""
+    return get_job_runner()
+
+
+job_runner = get_shared_job_runner()
+JOB_POLL_SECONDS = 2
+JOB_ICONS = {"queued": "⏳", "running": "🔄", "done": "✅", "failed": "❌"}
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def job_progress(job_id):
+    """Live status and log of a background job; reruns the page once it has finished"""
+    job = job_runner.store.get(job_id)
+    if job["status"] not in ACTIVE_STATUSES:
+        # Redraw the whole page so the stored result (or the error) shows up
+        st.rerun()
+    if job["status"] == "queued":
+        st.info(f"Job #{job_id} is queued and will start when a worker is free.")
+    else:
+        st.info(f"Job #{job_id} is running ({time.time() - job['started_at']:.0f}s). "
+                "You can keep browsing; the result will appear here.")
+    log = job_runner.log(job)
+    if log:
+        st.code(log, language="text")
+
+
+def gather_panel(satellite_name, data_type, label):
+    """Gather button for a missing category, or the progress of the job already gathering it"""
+    job = job_runner.latest(satellite_name, data_type)
+    if job and job["status"] in ACTIVE_STATUSES:
+        job_progress(job["id"])
+        return
+    if job and job["status"] == "failed":
+        st.error(f"The last attempt failed: {job['error']}")
+    if st.button(label, key=f"gather_{data_type}_{satellite_name}"):
+        job_runner.submit(satellite_name, data_type, fast=st.session_state.get("fast_mode", False))
+        st.rerun()
+
 # Initialize session state for satellite data if not exists
 if 'satellite_data' not in st.session_state:
     st.session_state.satellite_data = {
@@ -37,52 +89,29 @@ SHEET_ID = "1gWsnjIbK_c6oml5KytVbSQk7UF20P_0VAH6xSPm9Soc"  # <-- Replace with yo
 WORKSHEET_NAME = "Sheet1"
 
 def get_gspread_client():
+    # Imported here so page reruns that never touch the sheet don't load the Google clients
+    import gspread
+    from google.oauth2.service_account import Credentials
+
     creds_dict = st.secrets["google_service_account"]
     creds = Credentials.from_service_account_info(creds_dict, scopes=["https://www.googleapis.com/auth/spreadsheets"])
     client = gspread.authorize(creds)
     return client
 
+@st.cache_data(max_entries=4, show_spinner=False)
+def store_export(file_format, store_version):
+    """Export of the store as of store_version, shared by every session that prepared it"""
+    return export_bytes(data_manager, file_format)
+
+@st.cache_resource
+def get_sheet_upserter():
+    """Upserter shared by all sessions, so the sheet's row index is read once per TTL"""
+    sheet = get_gspread_client().open_by_key(SHEET_ID).worksheet(WORKSHEET_NAME)
+    return SheetUpserter(sheet)
+
 def upload_to_gsheet(satellite_name, data_dict):
-    # Prepare data: first column is satellite name, then each key as a column
-    row = {"satellite_name": satellite_name}
-    row.update(data_dict)
-    df = pd.DataFrame([row])
-    client = get_gspread_client()
-    sheet = client.open_by_key(SHEET_ID).worksheet(WORKSHEET_NAME)
-    # Get existing data to determine where to append
-    existing = pd.DataFrame(sheet.get_all_records())
-    # If sheet is empty, write headers
-    if existing.empty:
-        set_with_dataframe(sheet, df)
-    else:
-        # Append new row
-        set_with_dataframe(sheet, pd.concat([existing, df], ignore_index=True))
-
-class CaptureStdout:
-    def __init__(self, container):
-        self.container = container
-        self.placeholder = container.empty()
-        self.output = []
-        
-    def write(self, text):
-        if text:
-            self.output.append(text)
-            try:
-                self.placeholder.code(''.join(self.output), language="text")
-            except Exception as e:
-                print(f"Error updating UI: {e}")
-                try:
-                    self.placeholder = self.container.empty()
-                    self.placeholder.code(''.join(self.output), language="text")
-                except:
-                    pass
-        
-    def flush(self):
-        try:
-            if self.output:
-                self.placeholder.code(''.join(self.output), language="text")
-        except:
-            pass
+    # Update the satellite's row in place, or append it; only that row is written
+    return get_sheet_upserter().upsert(satellite_name, data_dict)
 
 # Title and description
 st.title("🛰️ SkyTrack: Satellite Info Explorer")
@@ -104,6 +133,12 @@ if 'satellite_name' not in st.session_state:
 if 'current_satellites' not in st.session_state:
     st.session_state.current_satellites = []
 
+st.sidebar.checkbox(
+    "Fast mode",
+    key="fast_mode",
+    help="Search once and extract every field with a single LLM call; the agent only runs for fields left empty."
+)
+
 # Replace text input with text area for multiple satellites
 satellite_input = st.sidebar.text_area(
     "Enter Satellite Names (one per line)", 
@@ -113,8 +148,14 @@ satellite_input = st.sidebar.text_area(
 
 # Process the input when the button is clicked
 if st.sidebar.button("Process Satellites"):
-    # Get all non-empty lines as satellites
-    new_satellites = [name.strip() for name in satellite_input.split('\n') if name.strip()]
+    # Get all non-empty lines as satellites, resolved to their stored names so other
+    # spellings, aliases and NORAD numbers of a known satellite don't start new lookups
+    new_satellites = []
+    for name in satellite_input.split('\n'):
+        if name.strip():
+            resolved = data_manager.resolve_name(name)
+            if all(name_key(resolved) != name_key(existing) for existing in new_satellites):
+                new_satellites.append(resolved)
     # Update the current satellites list
     st.session_state.current_satellites = new_satellites
     # Set the first satellite as active if list is not empty
@@ -122,6 +163,14 @@ if st.sidebar.button("Process Satellites"):
         st.session_state.satellite_name = new_satellites[0]
     st.rerun()
 
+# Queue a background job for every category not stored yet for the listed satellites
+if st.session_state.current_satellites and st.sidebar.button("Gather All Data for Listed Satellites"):
+    for sat in st.session_state.current_satellites:
+        for data_type in DATA_TYPES:
+            if data_manager.get_satellite_data(sat, data_type) is None:
+                job_runner.submit(sat, data_type, fast=st.session_state.get("fast_mode", False))
+    st.rerun()
+
 # Display current session satellites
 if st.session_state.current_satellites:
     st.sidebar.markdown("### Current Session Satellites")
@@ -138,11 +187,33 @@ if st.session_state.current_satellites:
                     st.session_state.satellite_name = st.session_state.current_satellites[0] if st.session_state.current_satellites else ""
                 st.rerun()
 
-# Display previously searched satellites
-existing_satellites = data_manager.get_all_satellites()
+# Display previously searched satellites: search and filters run on an in-memory
+# name index (rebuilt only when the store changes) and one page of rows is drawn
+BROWSER_PAGE_SIZE = 25
+name_index = get_name_index(data_manager)
+existing_satellites = len(name_index) > 0
 if existing_satellites:
     st.sidebar.markdown("### Previously Searched Satellites")
-    for sat in existing_satellites:
+
+    def reset_browser_page():
+        st.session_state.browser_page = 0
+
+    search_text = st.sidebar.text_input("Search stored satellites", key="browser_search", on_change=reset_browser_page)
+    orbit_filter = st.sidebar.multiselect("Orbit", ORBIT_CLASSES, key="browser_orbits", on_change=reset_browser_page)
+    freshness_filter = st.sidebar.multiselect(
+        "Freshness", FRESHNESS, key="browser_freshness", on_change=reset_browser_page,
+        help="fresh: every category stored and within the refresh TTL; stale: some category past it; "
+             "incomplete: some category not gathered yet"
+    )
+    page = st.session_state.get("browser_page", 0)
+    page_names, total = name_index.search(search_text, orbit_filter, freshness_filter, page, BROWSER_PAGE_SIZE)
+    pages = max(1, -(-total // BROWSER_PAGE_SIZE))
+    if page >= pages:
+        # The list shrank (deletes, new filters) past the current page
+        page = st.session_state.browser_page = pages - 1
+        page_names, total = name_index.search(search_text, orbit_filter, freshness_filter, page, BROWSER_PAGE_SIZE)
+
+    for sat in page_names:
         col1, col2 = st.sidebar.columns([4, 1])
         with col1:
             if st.button(sat, key=f"select_sat_{sat}"):
@@ -155,17 +226,68 @@ if existing_satellites:
                     st.session_state.satellite_name = ""
                 st.rerun()
 
-# Add download button for the entire satellite_data.json file
-file_path = "satellite_data.json"
-if os.path.exists(file_path):
-    with open(file_path, "r") as f:
-        all_satellite_data = f.read()
-    st.sidebar.download_button(
-        label="Download All Satellite Data (JSON)",
-        data=all_satellite_data,
-        file_name="satellite_data.json",
-        mime="application/json"
-    )
+    col1, col2, col3 = st.sidebar.columns([1, 3, 1])
+    with col1:
+        if st.button("◀", key="browser_prev", disabled=page == 0):
+            st.session_state.browser_page = page - 1
+            st.rerun()
+    with col2:
+        st.caption(f"Page {page + 1} of {pages} · {total} satellites")
+    with col3:
+        if st.button("▶", key="browser_next", disabled=page >= pages - 1):
+            st.session_state.browser_page = page + 1
+            st.rerun()
+
+# Add download button for the entire store: JSON in the satellite_data.json layout,
+# or one flat row per satellite as CSV/Parquet. It is only built on request, so store
+# writes (every finished job) don't make the next rerun rebuild it
+if existing_satellites:
+    export_format = st.sidebar.selectbox("Export format", list(EXPORT_FORMATS), key="export_format")
+    if st.sidebar.button("Prepare Export", key="prepare_export"):
+        st.session_state.prepared_export = (export_format, data_manager.version())
+    prepared = st.session_state.get("prepared_export")
+    if prepared and prepared[0] == export_format:
+        if prepared[1] != data_manager.version():
+            st.sidebar.caption("The store has changed since this export was prepared.")
+        st.sidebar.download_button(
+            label=f"Download All Satellite Data ({export_format.upper()})",
+            data=store_export(*prepared),
+            file_name=f"satellite_data.{export_format}",
+            mime=EXPORT_FORMATS[export_format]
+        )
+
+# Push the whole store to the sheet, sending only changed rows and cells
+if existing_satellites and st.sidebar.button("Sync All Satellites to Google Sheet"):
+    with st.sidebar.status("Syncing to Google Sheet...") as sync_status:
+        try:
+            sheet = get_gspread_client().open_by_key(SHEET_ID).worksheet(WORKSHEET_NAME)
+            summary = sync_store(sheet, data_manager)
+            # Rows may have moved or been added; re-read the single-upload index next time
+            get_sheet_upserter().invalidate()
+            sync_status.update(label="Google Sheet is up to date", state="complete")
+            st.sidebar.write(
+                f"{summary['rows_updated']} rows updated, {summary['rows_appended']} added, "
+                f"{summary['columns_added']} new columns, {summary['columns_renamed']} renamed, "
+                f"in {summary['write_requests']} write requests"
+            )
+        except Exception as e:
+            sync_status.update(label="Sync failed", state="error")
+            st.sidebar.error(f"Error syncing to Google Sheet: {str(e)}")
+
+# Recent background jobs from every session
+recent_jobs = job_runner.store.recent(10)
+if recent_jobs:
+    with st.sidebar.expander("Background Jobs", expanded=any(job["status"] in ACTIVE_STATUSES for job in recent_jobs)):
+        for job in recent_jobs:
+            st.markdown(f"{JOB_ICONS.get(job['status'], '')} #{job['id']} {job['satellite_name']} · {job['data_type']}")
+
+# LLM/search usage of every lookup run by this server process
+st.sidebar.download_button(
+    label="Download Run Metrics (Prometheus)",
+    data=get_metrics().to_prometheus(),
+    file_name="satellite_metrics.prom",
+    mime="text/plain"
+)
 
 # Main content area
 if st.session_state.satellite_name:
@@ -201,43 +323,7 @@ if st.session_state.satellite_name:
             )
         else:
             st.info("No basic information available. Use the fetch button below to gather data.")
-            if st.button("Gather Basic Information", key=f"gather_basic_{satellite_name}"):
-                with st.spinner("Gathering basic information..."):
-                    try:
-                        basic_bot = BasicInfoBot()
-                        with st.chat_message("assistant"):
-                            terminal_container = st.container()
-                            terminal_container.markdown("#### Agent Execution Log:")
-                            status = terminal_container.empty()
-                            status.info("Agent starting...")
-                            stdout_capture = CaptureStdout(terminal_container)
-                            old_stdout = sys.stdout
-                            sys.stdout = stdout_capture
-                            try:
-                                result = basic_bot.process_satellite(satellite_name)
-                                status.success("Agent finished.")
-                                if result:
-                                    st.success("Basic information gathered successfully!")
-                                    st.json(result)
-                                    json_str = json.dumps(result, indent=2)
-                                    st.download_button(
-                                        label="Download JSON",
-                                        data=json_str,
-                                        file_name=f"{satellite_name}_basic_info.json",
-                                        mime="application/json"
-                                    )
-                                    st.session_state.satellite_data["basic_info"] = result
-                                    data_manager.append_satellite_data(satellite_name, "basic_info", result)
-                                    st.rerun()
-                                else:
-                                    st.error("Failed to gather basic information.")
-                            except Exception as e:
-                                status.error(f"Agent failed: {e}")
-                                st.error(f"Error: {str(e)}")
-                            finally:
-                                sys.stdout = old_stdout
-                    except Exception as e:
-                        st.error(f"Failed to initialize BasicInfoBot: {str(e)}")
+            gather_panel(satellite_name, "basic_info", "Gather Basic Information")
 
     # Process and display technical specifications
     with tab2:
@@ -253,43 +339,7 @@ if st.session_state.satellite_name:
             )
         else:
             st.info("No technical specifications available. Use the fetch button below to gather data.")
-            if st.button("Gather Technical Specifications", key=f"gather_tech_{satellite_name}"):
-                with st.spinner("Gathering technical specifications..."):
-                    try:
-                        tech_bot = TechAgent()
-                        with st.chat_message("assistant"):
-                            terminal_container = st.container()
-                            terminal_container.markdown("#### Agent Execution Log:")
-                            status = terminal_container.empty()
-                            status.info("Agent starting...")
-                            stdout_capture = CaptureStdout(terminal_container)
-                            old_stdout = sys.stdout
-                            sys.stdout = stdout_capture
-                            try:
-                                result = tech_bot.process_satellite(satellite_name)
-                                status.success("Agent finished.")
-                                if result:
-                                    st.success("Technical specifications gathered successfully!")
-                                    st.json(result)
-                                    json_str = json.dumps(result, indent=2)
-                                    st.download_button(
-                                        label="Download JSON",
-                                        data=json_str,
-                                        file_name=f"{satellite_name}_tech_specs.json",
-                                        mime="application/json"
-                                    )
-                                    st.session_state.satellite_data["technical_specs"] = result
-                                    data_manager.append_satellite_data(satellite_name, "technical_specs", result)
-                                    st.rerun()
-                                else:
-                                    st.error("Failed to gather technical specifications.")
-                            except Exception as e:
-                                status.error(f"Agent failed: {e}")
-                                st.error(f"Error: {str(e)}")
-                            finally:
-                                sys.stdout = old_stdout
-                    except Exception as e:
-                        st.error(f"Failed to initialize TechAgent: {str(e)}")
+            gather_panel(satellite_name, "technical_specs", "Gather Technical Specifications")
 
     # Process and display launch and cost information
     with tab3:
@@ -305,43 +355,7 @@ if st.session_state.satellite_name:
             )
         else:
             st.info("No launch and cost information available. Use the fetch button below to gather data.")
-            if st.button("Gather Launch and Cost Information", key=f"gather_launch_{satellite_name}"):
-                with st.spinner("Gathering launch and cost information..."):
-                    try:
-                        cost_bot = CostBot()
-                        with st.chat_message("assistant"):
-                            terminal_container = st.container()
-                            terminal_container.markdown("#### Agent Execution Log:")
-                            status = terminal_container.empty()
-                            status.info("Agent starting...")
-                            stdout_capture = CaptureStdout(terminal_container)
-                            old_stdout = sys.stdout
-                            sys.stdout = stdout_capture
-                            try:
-                                result = cost_bot.process_satellite(satellite_name)
-                                status.success("Agent finished.")
-                                if result:
-                                    st.success("Launch and cost information gathered successfully!")
-                                    st.json(result)
-                                    json_str = json.dumps(result, indent=2)
-                                    st.download_button(
-                                        label="Download JSON",
-                                        data=json_str,
-                                        file_name=f"{satellite_name}_launch_cost.json",
-                                        mime="application/json"
-                                    )
-                                    st.session_state.satellite_data["launch_cost_info"] = result
-                                    data_manager.append_satellite_data(satellite_name, "launch_cost_info", result)
-                                    st.rerun()
-                                else:
-                                    st.error("Failed to gather launch and cost information.")
-                            except Exception as e:
-                                status.error(f"Agent failed: {e}")
-                                st.error(f"Error: {str(e)}")
-                            finally:
-                                sys.stdout = old_stdout
-                    except Exception as e:
-                        st.error(f"Failed to initialize CostBot: {str(e)}")
+            gather_panel(satellite_name, "launch_cost_info", "Gather Launch and Cost Information")
 
     # Display raw JSON data
     with tab4:
@@ -356,11 +370,11 @@ if st.session_state.satellite_name:
                 mime="application/json"
             )
             if st.button("Upload to Google Sheet"):
-                # Combine all data into one dict for upload (flatten if needed)
-                combined_data = {}
-                for section in ["basic_info", "technical_specs", "launch_cost_info"]:
-                    combined_data.update(st.session_state.satellite_data.get(section, {}))
-                upload_to_gsheet(satellite_name, combined_data)
+                # Section-prefixed columns, so fields of different bots never overwrite each other
+                upload_to_gsheet(
+                    satellite_name,
+                    flatten_record(satellite_name, data_manager.get_satellite_data(satellite_name))
+                )
                 st.success("Data uploaded to Google Sheet!")
 
     # Display last updated time if available
@@ -0,0 +1,152 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+
+import clients
+import fast_path
+from bot_pool import get_bot_pool
+from bots import DATA_TYPES, FailedLookup
+from data_manager import get_data_manager, name_key
+from metrics import export_metrics
+from refresh import refresh_satellite
+from tracing import trace_run
+
+
+class BatchProcessor:
+    """Run the bots over many satellites on a bounded worker pool
+
+    Every (satellite, data type) pair is one task. Gemini and Tavily calls are
+    additionally capped by their own process-wide concurrency limits, so the
+    pool can be sized for waiting on the network rather than for API quota.
+    gemini_concurrency / tavily_concurrency replace those limits only while
+    run() is executing.
+    Each result is written to the store as soon as its task finishes. A
+    lookup that failed (the bot's FailedLookup placeholder) is reported as
+    failed and not stored, so a resumed run tries it again.
+    """
+
+    def __init__(self, data_types=DATA_TYPES, max_workers=8, gemini_concurrency=None,
+                 tavily_concurrency=None, skip_existing=True, refresh_stale=False,
+                 fast_path=False, progress_callback=None, data_manager=None, write_batch_size=1):
+        self.data_types = list(data_types)
+        self.max_workers = max_workers
+        self.skip_existing = skip_existing
+        # Stored categories get only their missing or expired fields re-fetched
+        self.refresh_stale = refresh_stale
+        # One structured LLM call per category, with the agent only for empty fields
+        self.fast_path = fast_path
+        self.progress_callback = progress_callback
+        self.data_manager = data_manager or get_data_manager()
+        # Above 1, new results are buffered and committed in bulk with append_many
+        self.write_batch_size = max(1, write_batch_size)
+        self.gemini_concurrency = gemini_concurrency
+        self.tavily_concurrency = tavily_concurrency
+
+    def _run_task(self, satellite_name, data_type, refresh):
+        """Process one satellite with one bot and commit the result"""
+        started = time.perf_counter()
+        # Batch tasks are traced as a whole, so the store write shows up next to the lookup
+        with trace_run(f"{data_type} {satellite_name}", "task"):
+            bot = get_bot_pool().get(data_type)
+            if self.fast_path:
+                process = partial(fast_path.extract, bot)
+            else:
+                process = bot.process_satellite
+            if refresh:
+                result = refresh_satellite(
+                    satellite_name, data_type, bot=bot, data_manager=self.data_manager, process=process
+                )
+            else:
+                result = process(satellite_name)
+                if self.write_batch_size == 1 and not isinstance(result, FailedLookup):
+                    self.data_manager.append_satellite_data(satellite_name, data_type, result)
+        if isinstance(result, FailedLookup):
+            raise RuntimeError(f"Lookup failed: {result.reason}")
+        return result, time.perf_counter() - started
+
+    def _plan(self, satellite_names):
+        """Build the deduplicated task list, dropping work already in the store"""
+        tasks, skipped = [], []
+        seen = set()
+        for satellite_name in satellite_names:
+            if not satellite_name.strip():
+                continue
+            # Spellings, aliases and NORAD numbers of one satellite become a single task
+            satellite_name = self.data_manager.resolve_name(satellite_name)
+            if name_key(satellite_name) in seen:
+                continue
+            seen.add(name_key(satellite_name))
+            for data_type in self.data_types:
+                exists = self.data_manager.get_satellite_data(satellite_name, data_type) is not None
+                if exists and self.refresh_stale:
+                    tasks.append((satellite_name, data_type, True))
+                elif exists and self.skip_existing:
+                    skipped.append((satellite_name, data_type))
+                else:
+                    tasks.append((satellite_name, data_type, False))
+        return tasks, skipped
+
+    def _report(self, event):
+        if self.progress_callback:
+            try:
+                self.progress_callback(event)
+            except Exception as e:
+                print(f"Error in progress callback: {str(e)}")
+
+    def run(self, satellite_names):
+        """Process every satellite and return {satellite_name: {data_type: result}}
+
+        Progress events are delivered on the calling thread, so the callback may
+        safely update UI elements.
+        """
+        tasks, skipped = self._plan(satellite_names)
+        total = len(tasks)
+        results = {}
+        for satellite_name, data_type in skipped:
+            self._report({
+                "satellite_name": satellite_name, "data_type": data_type,
+                "status": "skipped", "completed": 0, "total": total
+            })
+
+        completed = 0
+        pending = []
+        limits = clients.concurrency_limits(gemini=self.gemini_concurrency, tavily=self.tavily_concurrency)
+        with limits, ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch") as executor:
+            futures = {
+                executor.submit(self._run_task, *task): task
+                for task in tasks
+            }
+            try:
+                for future in as_completed(futures):
+                    satellite_name, data_type, refresh = futures[future]
+                    completed += 1
+                    event = {
+                        "satellite_name": satellite_name, "data_type": data_type,
+                        "completed": completed, "total": total
+                    }
+                    try:
+                        result, elapsed = future.result()
+                        results.setdefault(satellite_name, {})[data_type] = result
+                        event.update(status="done", result=result, elapsed=elapsed)
+                        if self.write_batch_size > 1 and not refresh:
+                            pending.append((satellite_name, data_type, result))
+                    except Exception as e:
+                        print(f"Error processing {data_type} for {satellite_name}: {str(e)}")
+                        event.update(status="failed", error=str(e))
+                    if len(pending) >= self.write_batch_size:
+                        self.data_manager.append_many(pending)
+                        pending = []
+                    self._report(event)
+            finally:
+                # On interruption, drop queued tasks and commit what already finished
+                for future in futures:
+                    future.cancel()
+                self.data_manager.append_many(pending)
+        # Write the run's metrics when METRICS_EXPORT_PATH is set
+        export_metrics()
+        return results
+
+
+def process_batch(satellite_names, **kwargs):
+    """Convenience wrapper around BatchProcessor(**kwargs).run(satellite_names)"""
+    return BatchProcessor(**kwargs).run(satellite_names)
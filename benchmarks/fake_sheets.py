@@ -0,0 +1,101 @@
+import re
+
+
+def _cell_text(value):
+    """What get_all_values returns for a value written with value_input_option RAW"""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _column_letter(index):
+    letters = ""
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+class FakeWorksheet:
+    """In-memory stand-in for a gspread Worksheet covering the calls the Sheets sync uses
+
+    requests logs (call, cells written) per API request, to check request and quota use.
+    It lives apart from fakes.py so tests can use it without LangChain installed.
+    """
+
+    def __init__(self, rows=None, title="Sheet1", col_count=26):
+        self.title = title
+        self.rows = [list(row) for row in rows or []]
+        self.col_count = max([col_count] + [len(row) for row in self.rows])
+        self.requests = []
+
+    def add_cols(self, cols):
+        self.col_count += cols
+        self._record("add_cols")
+
+    def _record(self, name, cells=0):
+        self.requests.append((name, cells))
+
+    def get_all_values(self):
+        self._record("get_all_values")
+        return [list(row) for row in self.rows]
+
+    def row_values(self, row):
+        self._record("row_values")
+        return list(self.rows[row - 1]) if row <= len(self.rows) else []
+
+    def col_values(self, col):
+        self._record("col_values")
+        return [row[col - 1] if col <= len(row) else "" for row in self.rows]
+
+    def _set_cell(self, row, col, value):
+        if col > self.col_count:
+            raise ValueError(f"Range exceeds grid limits: column {col} > {self.col_count}")
+        while len(self.rows) < row:
+            self.rows.append([])
+        cells = self.rows[row - 1]
+        while len(cells) < col:
+            cells.append("")
+        cells[col - 1] = _cell_text(value)
+
+    def _write_range(self, range_name, values):
+        start = range_name.split(":")[0]
+        match = re.match(r"([A-Z]+)(\d+)", start)
+        col = 0
+        for char in match.group(1):
+            col = col * 26 + ord(char) - 64
+        row = int(match.group(2))
+        written = 0
+        for row_offset, row_values in enumerate(values):
+            for col_offset, value in enumerate(row_values):
+                # Like the Sheets API, None leaves the cell untouched
+                if value is not None:
+                    self._set_cell(row + row_offset, col + col_offset, value)
+                    written += 1
+        return written
+
+    def update(self, range_name=None, values=None, **kwargs):
+        self._record("update", self._write_range(range_name, values))
+
+    def batch_update(self, data, **kwargs):
+        cells = sum(self._write_range(item["range"], item["values"]) for item in data)
+        self._record("batch_update", cells)
+
+    def _appended(self, first_row, width):
+        return {"updates": {"updatedRange": f"'{self.title}'!A{first_row}:{_column_letter(width)}{len(self.rows)}"}}
+
+    def append_row(self, values, **kwargs):
+        self.rows.append([_cell_text(value) for value in values])
+        self._record("append_row", len(values))
+        return self._appended(len(self.rows), len(values))
+
+    def append_rows(self, values, **kwargs):
+        first_row = len(self.rows) + 1
+        for row in values:
+            self.rows.append([_cell_text(value) for value in row])
+        self._record("append_rows", sum(len(row) for row in values))
+        return self._appended(first_row, max((len(row) for row in values), default=1))
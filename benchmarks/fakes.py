@@ -0,0 +1,128 @@
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from typing import Any
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+# Field names in StructuredOutputParser format instructions, e.g. `"altitude": string  // ...`
+_FIELD_PATTERN = re.compile(r'"(\w+)": string')
+
+
+class CallCounter:
+    """Thread-safe call counter shared by the fake backends"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def record(self, failed=False):
+        with self._lock:
+            self.calls += 1
+            if failed:
+                self.errors += 1
+
+    def reset(self):
+        with self._lock:
+            self.calls = 0
+            self.errors = 0
+
+
+class FakeChatModel(BaseChatModel):
+    """Local stand-in for Gemini with configurable latency, error rate and payload size
+
+    It plays a minimal ReAct script: the first agent step searches, the next
+    one returns a Final Answer filling every field from the prompt's format
+    instructions. Prompts without ReAct instructions (the fast path) get the
+    JSON answer directly.
+    """
+
+    latency: float = 0.5
+    jitter: float = 0.2
+    error_rate: float = 0.0
+    payload_size: int = 40
+    counter: Any = None
+
+    @property
+    def _llm_type(self):
+        return "fake-satellite-llm"
+
+    def _delay(self):
+        return max(0.0, random.gauss(self.latency, self.latency * self.jitter))
+
+    def _respond(self, prompt):
+        fields = list(dict.fromkeys(_FIELD_PATTERN.findall(prompt)))
+        answer = {field: f"{field} value " + "x" * self.payload_size for field in fields}
+        answer_json = f"```json\n{json.dumps(answer, indent=2)}\n```"
+        if "Action Input" not in prompt:
+            return answer_json
+        # The ReAct template itself mentions "Observation:" once; more means a step has run
+        if prompt.count("Observation:") < 2:
+            return 'I should search the web for this satellite.\nAction: Tavily Search\nAction Input: satellite specifications'
+        return f"I now know the final answer\nFinal Answer: {answer_json}"
+
+    def _result(self, messages):
+        prompt = "\n".join(str(message.content) for message in messages)
+        failed = random.random() < self.error_rate
+        if self.counter is not None:
+            self.counter.record(failed)
+        if failed:
+            raise RuntimeError("Resource has been exhausted (injected by FakeChatModel)")
+        content = self._respond(prompt)
+        usage = {
+            "input_tokens": len(prompt) // 4,
+            "output_tokens": len(content) // 4,
+            "total_tokens": (len(prompt) + len(content)) // 4,
+        }
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content, usage_metadata=usage))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self._delay())
+        return self._result(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self._delay())
+        return self._result(messages)
+
+
+class FakeSearchTool:
+    """Local stand-in for TavilySearchResults with configurable latency, error rate and payload size"""
+
+    def __init__(self, latency=0.3, jitter=0.2, error_rate=0.0, results=5, payload_size=800, counter=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.results = results
+        self.payload_size = payload_size
+        self.counter = counter or CallCounter()
+
+    def _delay(self):
+        return max(0.0, random.gauss(self.latency, self.latency * self.jitter))
+
+    def _results(self, query):
+        failed = random.random() < self.error_rate
+        self.counter.record(failed)
+        if failed:
+            raise RuntimeError("Search failed (injected by FakeSearchTool)")
+        slug = re.sub(r"\W+", "-", str(query).lower()).strip("-")
+        return [
+            {
+                "url": f"https://example.test/{slug}/{index}",
+                "content": f"{query} result {index}: " + "lorem ipsum " * (self.payload_size // 12),
+            }
+            for index in range(self.results)
+        ]
+
+    def run(self, query):
+        time.sleep(self._delay())
+        return self._results(query)
+
+    async def arun(self, query):
+        await asyncio.sleep(self._delay())
+        return self._results(query)
@@ -0,0 +1,322 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Modules imported on each cold start: what app.py needs before drawing the page, the
+# CLI, and the bots (which load LangChain and are allowed to be slow)
+IMPORT_TARGETS = {
+    "app": ["config", "batch", "bot_pool", "fast_path", "data_manager", "export", "flatten", "gsheet",
+            "log_stream", "metrics", "name_index", "jobs"],
+    "cli": ["cli"],
+    "bots": ["basic", "tech", "cost"],
+}
+# Targets that must stay within --import-budget-ms and must not load HEAVY_MODULES
+BUDGETED_TARGETS = ("app", "cli")
+HEAVY_MODULES = ("langchain", "langchain_core", "langchain_google_genai", "langchain_community",
+                 "gspread", "google.oauth2", "pandas", "pyarrow", "requests")
+
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+for name in sys.argv[1:]:
+    __import__(name)
+print(json.dumps({"seconds": time.perf_counter() - started, "modules": sorted(sys.modules)}))
+"""
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies, wall_time, operations):
+    return {
+        "operations": operations,
+        "wall_time_s": round(wall_time, 4),
+        "throughput_per_s": round(operations / wall_time, 3) if wall_time else None,
+        "latency_p50_s": percentile(latencies, 50),
+        "latency_p95_s": percentile(latencies, 95),
+        "latency_p99_s": percentile(latencies, 99),
+    }
+
+
+def install_fakes(args):
+    """Point the shared clients at the local stand-ins and lift the real API quotas"""
+    import clients
+    from benchmarks.fakes import CallCounter, FakeChatModel, FakeSearchTool
+
+    llm_counter, search_counter = CallCounter(), CallCounter()
+    llm = FakeChatModel(
+        latency=args.llm_latency, error_rate=args.llm_error_rate,
+        payload_size=args.llm_payload, counter=llm_counter
+    )
+    search_tool = FakeSearchTool(
+        latency=args.search_latency, error_rate=args.search_error_rate,
+        results=args.search_results, payload_size=args.search_payload, counter=search_counter
+    )
+    clients.install_clients(llm=llm, search_client=clients.SearchClient(tool=search_tool))
+    if not args.keep_rate_limits:
+        clients.configure_rate_limits(0, 0, 0)
+    return llm_counter, search_counter
+
+
+def bench_bots(args, level, llm_counter, search_counter):
+    """Push satellites through the batch processor at one concurrency level"""
+    from batch import BatchProcessor
+
+    names = [f"BENCH-{args.mode}-{level}-{index}" for index in range(args.satellites)]
+    latencies = []
+    llm_counter.reset()
+    search_counter.reset()
+
+    def record(event):
+        if event["status"] == "done":
+            latencies.append(event["elapsed"])
+
+    processor = BatchProcessor(
+        data_types=args.data_types, max_workers=level, gemini_concurrency=level,
+        tavily_concurrency=level, fast_path=args.mode == "fast", progress_callback=record
+    )
+    tracemalloc.start()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        processor.run(names)
+    wall_time = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = summarize(latencies, wall_time, len(latencies))
+    result.update(
+        concurrency=level,
+        satellites=len(names),
+        llm_calls=llm_counter.calls,
+        llm_errors=llm_counter.errors,
+        llm_calls_per_satellite=round(llm_counter.calls / len(names), 3),
+        search_calls=search_counter.calls,
+        search_calls_per_satellite=round(search_counter.calls / len(names), 3),
+        peak_memory_mb=round(peak / 2 ** 20, 3),
+    )
+    return result
+
+
+def bench_store(args, level, backend):
+    """Concurrent append/get round trips against a fresh store"""
+    from data_manager import SatelliteDataManager
+
+    path = os.path.join(os.getcwd(), f"bench_store_{backend}_{level}.{'db' if backend == 'sqlite' else 'json'}")
+    manager = SatelliteDataManager(backend=backend, path=path)
+    payload = {f"field_{index}": "x" * 64 for index in range(16)}
+    latencies, lock = [], threading.Lock()
+
+    def work(worker):
+        for index in range(args.store_ops):
+            started = time.perf_counter()
+            name = f"SAT-{worker}-{index}"
+            manager.append_satellite_data(name, "basic_info", payload)
+            manager.get_satellite_data(name, "basic_info")
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=level) as executor:
+        list(executor.map(work, range(level)))
+    wall_time = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = summarize(latencies, wall_time, len(latencies))
+    result.update(backend=backend, concurrency=level, peak_memory_mb=round(peak / 2 ** 20, 3))
+    return result
+
+
+def bench_sheets(args):
+    """Initial and incremental Google Sheets sync of a synthetic store against a FakeWorksheet"""
+    from benchmarks.fake_sheets import FakeWorksheet
+    from gsheet import SheetSync
+    from rate_limiter import RateLimiter
+
+    def records(changed_every=0):
+        for index in range(args.sheet_satellites):
+            altitude = "550" if changed_every and index % changed_every == 0 else "500"
+            yield f"SAT-{index}", {
+                "basic_info": {"data": {"altitude": altitude, "altitude_source": "https://example.test"},
+                               "last_updated": "2026-01-01T00:00:00"},
+                "launch_cost_info": {"data": {"launch_mass": {"value": 260, "unit": "kg"}, "launch_cost": "NA"},
+                                     "last_updated": "2026-01-01T00:00:00"},
+            }
+
+    worksheet = FakeWorksheet()
+    # The fake has no quota; measure the requests, not the pacing
+    sync = SheetSync(worksheet, rate_limiter=RateLimiter())
+    runs = []
+    for label, changed_every in (("initial", 0), ("incremental", 100)):
+        worksheet.requests.clear()
+        started = time.perf_counter()
+        summary = sync.sync(records(changed_every))
+        wall_time = time.perf_counter() - started
+        result = summarize([wall_time], wall_time, args.sheet_satellites)
+        result.update(summary, backend=label, concurrency=1, api_requests=len(worksheet.requests))
+        runs.append(result)
+    return runs
+
+
+def bench_imports(args):
+    """Cold-start import time of each target, each run in a fresh interpreter"""
+    runs, problems = [], []
+    for target, modules in IMPORT_TARGETS.items():
+        latencies, loaded = [], set()
+        for _ in range(args.import_runs):
+            completed = subprocess.run(
+                [sys.executable, "-c", IMPORT_PROBE, *modules], cwd=ROOT, capture_output=True, text=True
+            )
+            if completed.returncode:
+                error = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "failed"
+                print(f"imports ({target}): skipped, {error}")
+                break
+            probe = json.loads(completed.stdout)
+            latencies.append(probe["seconds"])
+            loaded.update(probe["modules"])
+        if not latencies:
+            continue
+        heavy = sorted(name for name in HEAVY_MODULES if name in loaded)
+        result = summarize(latencies, sum(latencies), len(latencies))
+        result.update(backend=target, concurrency=1, heavy_modules=heavy)
+        runs.append(result)
+        if target in BUDGETED_TARGETS:
+            if result["latency_p50_s"] * 1000 > args.import_budget_ms:
+                problems.append(f"imports/{target}: {result['latency_p50_s'] * 1000:.1f} ms over the "
+                                f"{args.import_budget_ms} ms budget")
+            if heavy:
+                problems.append(f"imports/{target}: loads {', '.join(heavy)} at import")
+    return runs, problems
+
+
+def compare(current, baseline, tolerance):
+    """Return human-readable regressions of p95 latency or throughput beyond tolerance"""
+    regressions = []
+    baseline_runs = {(run["suite"], run.get("backend"), run["concurrency"]): run for run in baseline["runs"]}
+    for run in current["runs"]:
+        before = baseline_runs.get((run["suite"], run.get("backend"), run["concurrency"]))
+        if not before:
+            continue
+        label = f"{run['suite']}{'/' + run['backend'] if run.get('backend') else ''} @ {run['concurrency']}"
+        if before["latency_p95_s"] and run["latency_p95_s"] > before["latency_p95_s"] * (1 + tolerance):
+            regressions.append(f"{label}: p95 {before['latency_p95_s']:.4f}s -> {run['latency_p95_s']:.4f}s")
+        if before["throughput_per_s"] and run["throughput_per_s"] < before["throughput_per_s"] * (1 - tolerance):
+            regressions.append(f"{label}: throughput {before['throughput_per_s']} -> {run['throughput_per_s']}/s")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load and throughput benchmarks against local fake LLM/search backends")
+    parser.add_argument("--suite", choices=["bots", "store", "sheets", "imports", "all"], default="all")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16], help="Concurrency levels")
+    parser.add_argument("--satellites", type=int, default=20, help="Satellites per bot run")
+    parser.add_argument("--data-types", nargs="+", default=["basic_info", "technical_specs", "launch_cost_info"])
+    parser.add_argument("--mode", choices=["agent", "fast"], default="agent")
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-payload", type=int, default=40, help="Characters per generated field")
+    parser.add_argument("--search-latency", type=float, default=0.1)
+    parser.add_argument("--search-error-rate", type=float, default=0.0)
+    parser.add_argument("--search-results", type=int, default=5)
+    parser.add_argument("--search-payload", type=int, default=800, help="Characters per search result")
+    parser.add_argument("--keep-rate-limits", action="store_true", help="Keep the configured API quotas")
+    parser.add_argument("--store-ops", type=int, default=200, help="Store round trips per worker")
+    parser.add_argument("--store-backends", nargs="+", default=["sqlite", "json"])
+    parser.add_argument("--sheet-satellites", type=int, default=5000, help="Satellites in the Sheets sync run")
+    parser.add_argument("--import-runs", type=int, default=5, help="Fresh interpreters per import target")
+    parser.add_argument("--import-budget-ms", type=float, default=150,
+                        help="Allowed median import time of the app and CLI modules")
+    parser.add_argument("--output", default="benchmarks/results/latest.json")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    output = os.path.abspath(args.output)
+    baseline = os.path.abspath(args.baseline) if args.baseline else None
+    workdir = tempfile.mkdtemp(prefix="satellite-bench-")
+    # Keep the store, caches and checkpoints of the run out of the working tree
+    os.chdir(workdir)
+    os.environ.update(SEARCH_CACHE_ENABLED="0", LLM_CACHE_ENABLED="0",
+                      SATELLITE_DB_PATH=os.path.join(workdir, "satellite_data.db"))
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "settings": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "runs": [],
+    }
+    problems = []
+    if args.suite in ("bots", "all"):
+        llm_counter, search_counter = install_fakes(args)
+        for level in args.levels:
+            run = bench_bots(args, level, llm_counter, search_counter)
+            run["suite"] = f"bots-{args.mode}"
+            report["runs"].append(run)
+            print(f"bots ({args.mode}) @ {level}: {run['throughput_per_s']}/s, p95 {run['latency_p95_s']}s, "
+                  f"{run['llm_calls_per_satellite']} LLM calls/satellite, peak {run['peak_memory_mb']} MB")
+    if args.suite in ("store", "all"):
+        for backend in args.store_backends:
+            for level in args.levels:
+                run = bench_store(args, level, backend)
+                run["suite"] = "store"
+                report["runs"].append(run)
+                print(f"store ({backend}) @ {level}: {run['throughput_per_s']}/s, p95 {run['latency_p95_s']}s, "
+                      f"peak {run['peak_memory_mb']} MB")
+
+    if args.suite in ("sheets", "all"):
+        for run in bench_sheets(args):
+            run["suite"] = "sheets"
+            report["runs"].append(run)
+            print(f"sheets ({run['backend']}) x {run['operations']}: {run['api_requests']} API requests, "
+                  f"{run['cells_written']} cells written, {run['wall_time_s']}s")
+
+    if args.suite in ("imports", "all"):
+        runs, problems = bench_imports(args)
+        for run in runs:
+            run["suite"] = "imports"
+            report["runs"].append(run)
+            print(f"imports ({run['backend']}): p50 {run['latency_p50_s'] * 1000:.1f} ms, "
+                  f"heavy modules: {', '.join(run['heavy_modules']) or 'none'}")
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+    for problem in problems:
+        print(f"OVER BUDGET {problem}")
+    regressions = []
+    if baseline:
+        with open(baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+    return 1 if regressions or problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+import threading
+
+from bots import DATA_TYPES, get_bot_class
+
+
+class BotPool:
+    """Process-wide bot instances shared by every Streamlit session, rerun and batch worker
+
+    Bots keep no per-request state, so one instance per data type can serve
+    concurrent callers; they also share the Gemini model and Tavily client
+    from clients.py, which keep their HTTP connections alive.
+    """
+
+    def __init__(self):
+        self._bots = {}
+        self._lock = threading.Lock()
+        self._type_locks = {data_type: threading.Lock() for data_type in DATA_TYPES}
+
+    def get(self, data_type):
+        """Return the shared bot for a data type, building it on first use"""
+        bot = self._bots.get(data_type)
+        if bot is not None:
+            return bot
+        with self._lock:
+            type_lock = self._type_locks.setdefault(data_type, threading.Lock())
+        with type_lock:
+            if data_type not in self._bots:
+                self._bots[data_type] = get_bot_class(data_type)()
+            return self._bots[data_type]
+
+    def warm_up(self, data_types=DATA_TYPES, background=False):
+        """Build the bots ahead of the first request; optionally on a daemon thread"""
+        def build():
+            for data_type in data_types:
+                try:
+                    self.get(data_type)
+                except Exception as e:
+                    print(f"Error warming up {data_type} bot: {str(e)}")
+
+        if background:
+            thread = threading.Thread(target=build, name="bot-pool-warm-up", daemon=True)
+            thread.start()
+            return thread
+        build()
+
+
+_bot_pool = BotPool()
+
+
+def get_bot_pool():
+    """Return the process-wide bot pool"""
+    return _bot_pool
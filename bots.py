@@ -0,0 +1,33 @@
+import importlib
+
+# Data types stored by SatelliteDataManager, in the order the app shows them
+DATA_TYPES = ("basic_info", "technical_specs", "launch_cost_info")
+
+# Bot modules are imported on first use so callers don't pay for langchain up front
+BOT_CLASSES = {
+    "basic_info": ("basic", "BasicInfoBot"),
+    "technical_specs": ("tech", "TechAgent"),
+    "launch_cost_info": ("cost", "CostBot"),
+}
+
+
+def get_bot_class(data_type):
+    """Import and return the bot class that produces a data type"""
+    if data_type not in BOT_CLASSES:
+        raise ValueError(f"Unknown data type: {data_type}")
+    module_name, class_name = BOT_CLASSES[data_type]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+class FailedLookup(dict):
+    """The "NA" placeholder output a bot returns when its lookup failed
+
+    It is the same dict the bots have always returned, so the app shows it
+    as before, but batch runs and jobs can tell it apart from real data,
+    report the lookup as failed and keep it out of the store. reason is the
+    error that caused it.
+    """
+
+    def __init__(self, data, reason):
+        super().__init__(data)
+        self.reason = reason
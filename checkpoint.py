@@ -0,0 +1,271 @@
+import asyncio
+import json
+import threading
+import time
+
+from langchain_core.agents import AgentAction, AgentFinish
+from langchain_core.callbacks import AsyncCallbackManager, CallbackManager
+from langchain_core.exceptions import OutputParserException
+from tenacity import AsyncRetrying, Retrying, retry_if_exception, stop_after_attempt, wait_exponential
+
+import config
+from data_manager import name_key
+from sqlite_local import SqliteConnections
+from tracing import span
+
+DEFAULT_CHECKPOINT_FILE = "agent_checkpoints.db"
+
+# Exception class names (anywhere in the MRO) of quota, timeout, connection and server errors
+TRANSIENT_ERROR_NAMES = {
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError", "BadGateway",
+    "GatewayTimeout", "DeadlineExceeded", "Timeout", "ReadTimeout", "ConnectTimeout",
+    "ClientConnectionError", "ServerDisconnectedError",
+}
+
+
+def is_transient_error(e):
+    """Whether an error may go away on its own: quota, timeout, connection or 5xx
+
+    Parse and validation errors come back the same on every attempt, so they
+    are not retried.
+    """
+    if isinstance(e, (TimeoutError, ConnectionError)):
+        return True
+    if TRANSIENT_ERROR_NAMES & {cls.__name__ for cls in type(e).__mro__}:
+        return True
+    response = getattr(e, "response", None)
+    for status in (getattr(e, "code", None), getattr(e, "status", None), getattr(response, "status_code", None)):
+        if isinstance(status, int) and (status == 429 or 500 <= status < 600):
+            return True
+    return "Resource has been exhausted" in str(e)
+
+
+# The only retry layer for agent runs: the Gemini client does not retry and the bots
+# do not re-run a failed agent, so a step is attempted at most three times
+STEP_RETRY = dict(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=2, max=30),
+    retry=retry_if_exception(is_transient_error),
+    reraise=True
+)
+
+
+class CheckpointStore:
+    """Completed agent steps persisted as they finish, keyed by run"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS agent_steps (
+            run_key TEXT NOT NULL,
+            step INTEGER NOT NULL,
+            tool TEXT NOT NULL,
+            tool_input TEXT NOT NULL,
+            log TEXT NOT NULL,
+            observation TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            PRIMARY KEY (run_key, step)
+        );
+        CREATE INDEX IF NOT EXISTS idx_agent_steps_created ON agent_steps (created_at);
+    """
+
+    def __init__(self, path=DEFAULT_CHECKPOINT_FILE, max_age_seconds=7 * 24 * 3600):
+        self.path = path
+        self._db = SqliteConnections(path, self.SCHEMA)
+        # Checkpoints this old belong to runs nobody is going to resume
+        self._db.get().execute("DELETE FROM agent_steps WHERE created_at < ?", (time.time() - max_age_seconds,))
+
+    def load(self, run_key):
+        """Return the completed (AgentAction, observation) steps of a run"""
+        rows = self._db.get().execute(
+            "SELECT tool, tool_input, log, observation FROM agent_steps WHERE run_key = ? ORDER BY step",
+            (run_key,)
+        ).fetchall()
+        return [
+            (AgentAction(tool=tool, tool_input=json.loads(tool_input), log=log), json.loads(observation))
+            for tool, tool_input, log, observation in rows
+        ]
+
+    def append(self, run_key, step, action, observation):
+        """Persist one completed step"""
+        self._db.get().execute(
+            """
+            INSERT OR REPLACE INTO agent_steps (run_key, step, tool, tool_input, log, observation, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (run_key, step, action.tool, json.dumps(action.tool_input, default=str), action.log,
+             json.dumps(observation, default=str), time.time())
+        )
+
+    def clear(self, run_key):
+        """Drop the checkpoint of a finished run"""
+        self._db.get().execute("DELETE FROM agent_steps WHERE run_key = ?", (run_key,))
+
+
+def checkpoint_key(bot_name, satellite_name, fields=None):
+    """Identify a run by what it looks up: (bot, satellite, requested fields)
+
+    Not by its prompt, which embeds the research corpus; a resumed run
+    gathers the corpus again and it need not come back byte-identical.
+    """
+    requested = ",".join(sorted(fields)) if fields else "*"
+    return f"{bot_name}:{name_key(satellite_name)}:{requested}"
+
+
+_checkpoint_store = None
+_checkpoint_store_lock = threading.Lock()
+
+
+def get_checkpoint_store():
+    """Return the process-wide checkpoint store, or None when AGENT_CHECKPOINTS_ENABLED=0"""
+    global _checkpoint_store
+    if config.get("AGENT_CHECKPOINTS_ENABLED", "1") == "0":
+        return None
+    with _checkpoint_store_lock:
+        if _checkpoint_store is None:
+            _checkpoint_store = CheckpointStore(config.get("AGENT_CHECKPOINT_PATH", DEFAULT_CHECKPOINT_FILE))
+        return _checkpoint_store
+
+
+def _parsing_error_step(e):
+    """Mirror AgentExecutor(handle_parsing_errors=True): feed the error back to the LLM"""
+    observation = "Invalid or incomplete response"
+    text = str(e)
+    if e.send_to_llm:
+        observation = str(e.observation)
+        text = str(e.llm_output)
+    return AgentAction("_Exception", observation, text)
+
+
+def _timed_out(executor, started):
+    return executor.max_execution_time is not None and time.monotonic() - started >= executor.max_execution_time
+
+
+def run_agent(executor, inputs, run_key=None, store=None, callbacks=None):
+    """Run a ReAct AgentExecutor step by step, checkpointing each completed step
+
+    Behaves like executor.invoke(inputs) with return_intermediate_steps=True,
+    but resumes from the steps already stored under run_key and retries each
+    plan/tool step on its own instead of restarting the whole agent.
+    """
+    store = store if store is not None else get_checkpoint_store()
+    agent = executor.agent
+    tools = {tool.name: tool for tool in executor.tools}
+    steps = store.load(run_key) if store and run_key else []
+    if steps:
+        print(f"Resuming agent from checkpoint after {len(steps)} completed steps")
+
+    callback_manager = CallbackManager.configure(callbacks, executor.callbacks, executor.verbose)
+    run_manager = callback_manager.on_chain_start({"name": "AgentExecutor"}, inputs, name="AgentExecutor")
+    started = time.monotonic()
+    try:
+        while len(steps) < executor.max_iterations and not _timed_out(executor, started):
+            with span("agent_step", "agent", step=len(steps)):
+                for attempt in Retrying(**STEP_RETRY, before_sleep=run_manager.on_retry):
+                    with attempt:
+                        try:
+                            with span("agent_plan", "llm"):
+                                decision = agent.plan(steps, callbacks=run_manager.get_child(), **inputs)
+                        except OutputParserException as e:
+                            decision = _parsing_error_step(e)
+
+                if isinstance(decision, AgentFinish):
+                    run_manager.on_agent_finish(decision, color="green")
+                    outputs = {**decision.return_values, "intermediate_steps": steps}
+                    break
+
+                run_manager.on_agent_action(decision, color="green")
+                if decision.tool == "_Exception":
+                    observation = decision.tool_input
+                elif decision.tool in tools:
+                    tool = tools[decision.tool]
+                    for attempt in Retrying(**STEP_RETRY, before_sleep=run_manager.on_retry):
+                        with attempt:
+                            with span("tool", "tool", tool=decision.tool):
+                                observation = tool.run(
+                                    decision.tool_input,
+                                    verbose=executor.verbose,
+                                    callbacks=run_manager.get_child(),
+                                    **agent.tool_run_logging_kwargs()
+                                )
+                else:
+                    observation = f"{decision.tool} is not a valid tool, try one of [{', '.join(tools)}]."
+
+                steps.append((decision, observation))
+                if store and run_key:
+                    store.append(run_key, len(steps) - 1, decision, observation)
+        else:
+            stopped = agent.return_stopped_response(executor.early_stopping_method, steps, **inputs)
+            outputs = {**stopped.return_values, "intermediate_steps": steps}
+    except BaseException as e:
+        run_manager.on_chain_error(e)
+        raise
+
+    run_manager.on_chain_end(outputs)
+    if store and run_key:
+        store.clear(run_key)
+    return outputs
+
+
+async def arun_agent(executor, inputs, run_key=None, store=None, callbacks=None):
+    """Async version of run_agent"""
+    store = store if store is not None else get_checkpoint_store()
+    agent = executor.agent
+    tools = {tool.name: tool for tool in executor.tools}
+    steps = store.load(run_key) if store and run_key else []
+    if steps:
+        print(f"Resuming agent from checkpoint after {len(steps)} completed steps")
+
+    callback_manager = AsyncCallbackManager.configure(callbacks, executor.callbacks, executor.verbose)
+    run_manager = await callback_manager.on_chain_start({"name": "AgentExecutor"}, inputs, name="AgentExecutor")
+    # tenacity calls before_sleep synchronously, so report retries through the sync manager
+    retry_hook = run_manager.get_sync().on_retry
+    started = time.monotonic()
+    try:
+        while len(steps) < executor.max_iterations and not _timed_out(executor, started):
+            with span("agent_step", "agent", step=len(steps)):
+                async for attempt in AsyncRetrying(**STEP_RETRY, before_sleep=retry_hook):
+                    with attempt:
+                        try:
+                            with span("agent_plan", "llm"):
+                                decision = await agent.aplan(steps, callbacks=run_manager.get_child(), **inputs)
+                        except OutputParserException as e:
+                            decision = _parsing_error_step(e)
+
+                if isinstance(decision, AgentFinish):
+                    await run_manager.on_agent_finish(decision, color="green")
+                    outputs = {**decision.return_values, "intermediate_steps": steps}
+                    break
+
+                await run_manager.on_agent_action(decision, color="green")
+                if decision.tool == "_Exception":
+                    observation = decision.tool_input
+                elif decision.tool in tools:
+                    tool = tools[decision.tool]
+                    async for attempt in AsyncRetrying(**STEP_RETRY, before_sleep=retry_hook):
+                        with attempt:
+                            with span("tool", "tool", tool=decision.tool):
+                                observation = await tool.arun(
+                                    decision.tool_input,
+                                    verbose=executor.verbose,
+                                    callbacks=run_manager.get_child(),
+                                    **agent.tool_run_logging_kwargs()
+                                )
+                else:
+                    observation = f"{decision.tool} is not a valid tool, try one of [{', '.join(tools)}]."
+
+                steps.append((decision, observation))
+                if store and run_key:
+                    store.append(run_key, len(steps) - 1, decision, observation)
+        else:
+            # With early_stopping_method="generate" this is a blocking LLM call, so keep it off the loop
+            stopped = await asyncio.to_thread(
+                agent.return_stopped_response, executor.early_stopping_method, steps, **inputs
+            )
+            outputs = {**stopped.return_values, "intermediate_steps": steps}
+    except BaseException as e:
+        await run_manager.on_chain_error(e)
+        raise
+
+    await run_manager.on_chain_end(outputs)
+    if store and run_key:
+        store.clear(run_key)
+    return outputs
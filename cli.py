@@ -0,0 +1,130 @@
+import argparse
+import contextlib
+import json
+import os
+import sys
+
+from batch import BatchProcessor
+from bots import DATA_TYPES
+from data_manager import get_data_manager
+
+# Short names accepted by --types, next to the stored data type names
+TYPE_ALIASES = {"basic": "basic_info", "tech": "technical_specs", "cost": "launch_cost_info"}
+
+
+def read_names(source):
+    """Satellite names from a file path or "-" for stdin, one per line; blank lines and # comments are skipped"""
+    stream = sys.stdin if source == "-" else open(source)
+    try:
+        for line in stream:
+            name = line.split("#", 1)[0].strip()
+            if name:
+                yield name
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def parse_types(values):
+    types = []
+    for value in values:
+        for item in value.split(","):
+            item = item.strip()
+            data_type = TYPE_ALIASES.get(item, item)
+            if data_type not in DATA_TYPES:
+                raise argparse.ArgumentTypeError(
+                    f"Unknown type '{item}', choose from {', '.join(list(TYPE_ALIASES) + list(DATA_TYPES))}"
+                )
+            if data_type not in types:
+                types.append(data_type)
+    return types
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run the satellite bots without the web interface, streaming results as JSONL"
+    )
+    parser.add_argument("names", nargs="?", default="-",
+                        help="File with one satellite name per line, or - for stdin (default)")
+    parser.add_argument("-t", "--types", nargs="+", default=["basic", "tech", "cost"],
+                        help="Bots to run: basic, tech, cost (default: all)")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file, or - for stdout (default)")
+    parser.add_argument("-w", "--workers", type=int, default=8, help="Lookups in flight")
+    parser.add_argument("--gemini-concurrency", type=int, help="Simultaneous Gemini requests")
+    parser.add_argument("--tavily-concurrency", type=int, help="Simultaneous Tavily searches")
+    parser.add_argument("--write-batch-size", type=int, default=25,
+                        help="Results committed to the store per write (default 25)")
+    parser.add_argument("--fast", action="store_true", help="Use the fast path instead of the full agent")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Re-fetch missing or expired fields of satellites already stored")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="Process satellites already in the store again instead of skipping them")
+    parser.add_argument("--quiet", action="store_true", help="Discard agent logs instead of sending them to stderr")
+    parser.add_argument("--catalog", help="Satellite catalog CSV (e.g. a CelesTrak SATCAT export) whose NORAD "
+                                          "numbers should resolve to satellite names")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        data_types = parse_types(args.types)
+    except argparse.ArgumentTypeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    names = list(read_names(args.names))
+    # Resuming into a file keeps the lines written by earlier runs
+    output = sys.stdout if args.output == "-" else open(args.output, "w" if args.no_resume else "a")
+    counts = {"done": 0, "failed": 0, "skipped": 0}
+
+    def emit(event):
+        counts[event["status"]] += 1
+        record = {key: event[key] for key in ("satellite_name", "data_type", "status") if key in event}
+        if "elapsed" in event:
+            record["elapsed"] = round(event["elapsed"], 3)
+        if "result" in event:
+            record["result"] = event["result"]
+        if "error" in event:
+            record["error"] = event["error"]
+        output.write(json.dumps(record) + "\n")
+        output.flush()
+        if event["status"] != "skipped":
+            print(f"[{event['completed']}/{event['total']}] {event['satellite_name']} {event['data_type']}: "
+                  f"{event['status']}", file=sys.stderr)
+
+    # Agent logs go to stderr (or nowhere) so stdout carries only JSONL; the store and
+    # bots are opened inside the redirect too, so nothing they print lands in the stream
+    log_sink = open(os.devnull, "w") if args.quiet else sys.stderr
+    try:
+        with contextlib.redirect_stdout(log_sink):
+            if args.catalog:
+                count = get_data_manager().import_catalog(args.catalog)
+                print(f"Registered {count} NORAD numbers from {args.catalog}", file=sys.stderr)
+            processor = BatchProcessor(
+                data_types=data_types,
+                max_workers=args.workers,
+                gemini_concurrency=args.gemini_concurrency,
+                tavily_concurrency=args.tavily_concurrency,
+                skip_existing=not args.no_resume,
+                refresh_stale=args.refresh,
+                fast_path=args.fast,
+                progress_callback=emit,
+                write_batch_size=args.write_batch_size,
+            )
+            processor.run(names)
+    except KeyboardInterrupt:
+        print("Interrupted; finished results were saved, rerun to resume", file=sys.stderr)
+        return 130
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if log_sink is not sys.stderr:
+            log_sink.close()
+
+    print(f"{counts['done']} done, {counts['failed']} failed, {counts['skipped']} already stored",
+          file=sys.stderr)
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
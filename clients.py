@@ -0,0 +1,208 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager, contextmanager
+
+import config
+from rate_limiter import RateLimiter
+from search_cache import get_search_cache
+from tracing import span
+
+# The Gemini and Tavily client classes live in providers.py and are imported on first
+# use, so modules that only need the limits or the shared getters load quickly
+
+
+class ConcurrencyLimiter:
+    """Caps how many calls to one API are in flight at once, across threads and event loops"""
+
+    def __init__(self, limit):
+        self._condition = threading.Condition()
+        self._active = 0
+        self.limit = limit
+
+    def configure(self, limit):
+        """Change the limit; callers already holding a slot keep it"""
+        with self._condition:
+            self.limit = limit
+            self._condition.notify_all()
+
+    def acquire(self, blocking=True):
+        with self._condition:
+            while self.limit and self._active >= self.limit:
+                if not blocking:
+                    return False
+                self._condition.wait()
+            self._active += 1
+            return True
+
+    def release(self):
+        with self._condition:
+            self._active -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def aslot(self):
+        # Poll instead of blocking so the event loop keeps running other lookups
+        while not self.acquire(blocking=False):
+            await asyncio.sleep(0.05)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+# Process-wide limits shared by every bot instance; 0 means unlimited
+gemini_limiter = ConcurrencyLimiter(int(config.get("GEMINI_MAX_CONCURRENCY", "4")))
+tavily_limiter = ConcurrencyLimiter(int(config.get("TAVILY_MAX_CONCURRENCY", "8")))
+
+
+def configure_limits(gemini=None, tavily=None):
+    """Set the process-wide concurrency limits for Gemini and Tavily calls"""
+    if gemini is not None:
+        gemini_limiter.configure(gemini)
+    if tavily is not None:
+        tavily_limiter.configure(tavily)
+
+
+@contextmanager
+def concurrency_limits(gemini=None, tavily=None):
+    """Apply configure_limits for the duration of a block, then restore the previous limits"""
+    previous = gemini_limiter.limit, tavily_limiter.limit
+    configure_limits(gemini=gemini, tavily=tavily)
+    try:
+        yield
+    finally:
+        configure_limits(*previous)
+
+
+# Process-wide quotas; defaults match the Gemini 1.5 Flash free tier and a Tavily dev key
+gemini_rate_limiter = RateLimiter(
+    requests_per_minute=int(config.get("GEMINI_REQUESTS_PER_MINUTE", "15")),
+    tokens_per_minute=int(config.get("GEMINI_TOKENS_PER_MINUTE", "1000000"))
+)
+tavily_rate_limiter = RateLimiter(
+    requests_per_minute=int(config.get("TAVILY_REQUESTS_PER_MINUTE", "100"))
+)
+
+
+def configure_rate_limits(gemini_requests_per_minute=None, gemini_tokens_per_minute=None,
+                          tavily_requests_per_minute=None):
+    """Change the process-wide request and token quotas; 0 disables a limit"""
+    if gemini_requests_per_minute is not None or gemini_tokens_per_minute is not None:
+        gemini_rate_limiter.configure(
+            gemini_requests_per_minute if gemini_requests_per_minute is not None
+            else gemini_rate_limiter.requests_per_minute,
+            gemini_tokens_per_minute if gemini_tokens_per_minute is not None
+            else gemini_rate_limiter.tokens_per_minute
+        )
+    if tavily_requests_per_minute is not None:
+        tavily_rate_limiter.configure(tavily_requests_per_minute)
+
+
+class SearchClient:
+    """Tavily search shared by all bots: cached results first, then the rate-limited API"""
+
+    def __init__(self, max_results=10, cache=None, tool=None):
+        if tool is None:
+            from providers import create_search_tool
+            tool = create_search_tool(max_results)
+        self.tool = tool
+        self.cache = cache
+
+    def _cached(self, query):
+        return self.cache.get(query) if self.cache is not None else None
+
+    def _store(self, query, result):
+        # Error strings from the tool are not cached, only real result lists
+        if self.cache is not None and isinstance(result, list):
+            self.cache.set(query, result)
+
+    def run(self, query):
+        with span("tavily_search", "search", query=str(query)[:200]) as details:
+            cached = self._cached(query)
+            details["cached"] = cached is not None
+            if cached is not None:
+                return cached
+            with span("tavily_rate_limit_wait", "wait"):
+                tavily_rate_limiter.acquire()
+            with tavily_limiter.slot():
+                result = self.tool.run(query)
+            self._store(query, result)
+            return result
+
+    async def arun(self, query):
+        with span("tavily_search", "search", query=str(query)[:200]) as details:
+            cached = self._cached(query)
+            details["cached"] = cached is not None
+            if cached is not None:
+                return cached
+            with span("tavily_rate_limit_wait", "wait"):
+                await tavily_rate_limiter.aacquire()
+            async with tavily_limiter.aslot():
+                result = await self.tool.arun(query)
+            self._store(query, result)
+            return result
+
+
+def create_llm():
+    """Create the Gemini chat model used by the bots"""
+    from llm_cache import get_llm_cache
+    from providers import ThrottledChatGoogleGenerativeAI
+    return ThrottledChatGoogleGenerativeAI(
+        model="gemini-1.5-flash",
+        api_key=config.get("GOOGLE_API_KEY"),
+        temperature=0.1,  # Lower temperature for more consistent output
+        # Agent steps are retried in checkpoint.STEP_RETRY; retrying here as well multiplies the attempts
+        max_retries=0,
+        timeout=120,
+        # None falls back to LangChain's global cache (off unless configured);
+        # hits are served before _generate, so they skip the concurrency limit
+        cache=get_llm_cache()
+    )
+
+
+_llm = None
+_llm_lock = threading.Lock()
+
+
+def get_llm():
+    """Return the process-wide Gemini model, reusing its client connection across bots"""
+    global _llm
+    with _llm_lock:
+        if _llm is None:
+            _llm = create_llm()
+        return _llm
+
+
+_search_client = None
+_search_client_lock = threading.Lock()
+
+
+def get_search_client():
+    """Return the process-wide Tavily search client"""
+    global _search_client
+    with _search_client_lock:
+        if _search_client is None:
+            _search_client = SearchClient(max_results=10, cache=get_search_cache())
+        return _search_client
+
+
+def install_clients(llm=None, search_client=None):
+    """Replace the shared Gemini model and/or search client, e.g. with local stand-ins
+
+    Only bots built afterwards pick up the replacements.
+    """
+    global _llm, _search_client
+    if llm is not None:
+        with _llm_lock:
+            _llm = llm
+    if search_client is not None:
+        with _search_client_lock:
+            _search_client = search_client
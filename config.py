@@ -0,0 +1,27 @@
+import os
+import threading
+
+_loaded = False
+_lock = threading.Lock()
+
+
+def load():
+    """Load .env into the environment once per process; variables already set win"""
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if not _loaded:
+            try:
+                from dotenv import load_dotenv
+            except ImportError:  # Without python-dotenv only the real environment is used
+                pass
+            else:
+                load_dotenv()
+            _loaded = True
+
+
+def get(name, default=None):
+    """A setting from the environment or .env, or default when unset"""
+    load()
+    return os.getenv(name, default)
@@ -1,53 +1,762 @@
+import csv
 import json
 import os
+import re
+import sys
+import tempfile
+import threading
+import unicodedata
+from contextlib import contextmanager
 from datetime import datetime
 
-class SatelliteDataManager:
-    def __init__(self):
-        self.data_file = "satellite_data.json"
-        self.load_data()
+import config
+from sqlite_local import SqliteConnections
+from tracing import span
 
-    def load_data(self):
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_JSON_FILE = "satellite_data.json"
+DEFAULT_DB_FILE = "satellite_data.db"
+
+# "25544", "NORAD 25544", "norad:25544", "NORAD ID 25544"
+NORAD_PATTERN = re.compile(r"^(?:NORAD(?:[\s_-]*(?:CAT(?:ALOG)?[\s_-]*)?(?:ID|NO|NUMBER))?[\s:#_-]*)?(\d{1,9})$", re.I)
+
+
+def name_key(satellite_name):
+    """Matching key for a satellite name: case, punctuation and spacing are ignored
+
+    "STARLINK 1", "Starlink-1" and "starlink1" all become "STARLINK 1".
+    """
+    text = unicodedata.normalize("NFKC", str(satellite_name)).upper()
+    text = re.sub(r"[\W_]+", " ", text)
+    # Split letters from digits so "STARLINK1" matches "STARLINK 1"
+    text = re.sub(r"(?<=[^\W\d_])(?=\d)|(?<=\d)(?=[^\W\d_])", " ", text)
+    return " ".join(text.split())
+
+
+def norad_id(text):
+    """The NORAD catalog number a name refers to, or None if it isn't one"""
+    match = NORAD_PATTERN.match(str(text).strip())
+    return int(match.group(1)) if match else None
+
+
+def norad_alias(number):
+    return f"norad:{int(number)}"
+
+
+def _stat_stamp(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _write_json_atomic(path, data):
+    """Replace path with data as JSON without readers ever seeing a partial file"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".satellite_data.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+@contextmanager
+def file_lock(lock_path):
+    """Hold an exclusive inter-process lock on lock_path for the duration of the block"""
+    with open(lock_path, "a+") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class JsonStore:
+    """Storage engine that keeps the whole store in a single JSON file
+
+    Writes hold an exclusive lock on a sidecar .lock file, re-read the file if
+    another process changed it, and atomically replace it, so concurrent
+    writers never drop each other's satellites. Reads only re-parse the file
+    when its stat signature changes. Aliases live in a sidecar
+    <name>.aliases.json so satellite_data.json keeps its original layout.
+    The name_key -> name map used to resolve spellings is built when the file
+    is loaded and kept up to date by this process's own writes.
+    """
+
+    def __init__(self, path=DEFAULT_JSON_FILE):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self.alias_path = os.path.splitext(path)[0] + ".aliases.json"
+        self._lock = threading.RLock()
+        self._stamp = None
+        self._keys = {}
+        self._alias_cache = (None, {})
+        self.load()
+
+    def _file_stamp(self):
+        return _stat_stamp(self.path)
+
+    def load(self):
         """Load data from JSON file"""
-        if os.path.exists(self.data_file):
-            with open(self.data_file, 'r') as f:
-                self.data = json.load(f)
+        with self._lock:
+            stamp = self._file_stamp()
+            if stamp is not None:
+                with open(self.path, 'r') as f:
+                    self.data = json.load(f)
+            else:
+                self.data = {}
+            self._stamp = stamp
+            self._index_names()
+
+    def _index_names(self):
+        self._keys = {}
+        for satellite_name in self.data:
+            # With pre-existing duplicate spellings, the first stored one wins
+            self._keys.setdefault(name_key(satellite_name), satellite_name)
+
+    def refresh(self):
+        """Reload the file only if another writer changed it since the last load"""
+        if self._file_stamp() != self._stamp:
+            self.load()
+
+    def save(self):
+        """Atomically replace the JSON file with the in-memory data"""
+        with self._lock:
+            _write_json_atomic(self.path, self.data)
+            self._stamp = self._file_stamp()
+
+    @contextmanager
+    def _write(self):
+        """Serialize a read-modify-write cycle across threads and processes"""
+        with self._lock, file_lock(self.lock_path):
+            self.refresh()
+            try:
+                yield
+            except BaseException:
+                # Drop whatever the failed cycle changed in memory so the next save cannot write it
+                self.load()
+                raise
+            self.save()
+
+    def version(self):
+        """Change token that differs whenever the data or alias file has been rewritten"""
+        return self._file_stamp(), _stat_stamp(self.alias_path)
+
+    def get(self, satellite_name):
+        """Get every entry stored for a satellite"""
+        self.refresh()
+        return self.data.get(satellite_name)
+
+    def get_entry(self, satellite_name, data_type):
+        """Get a single data type entry for a satellite"""
+        self.refresh()
+        return self.data.get(satellite_name, {}).get(data_type)
+
+    def _put(self, satellite_name, data_type, entry):
+        self.data.setdefault(satellite_name, {})[data_type] = entry
+        self._keys.setdefault(name_key(satellite_name), satellite_name)
+
+    def upsert(self, satellite_name, data_type, entry):
+        """Insert or replace a single data type entry"""
+        with self._write():
+            self._put(satellite_name, data_type, entry)
+
+    def update_entry(self, satellite_name, data_type, update):
+        """Atomically replace an entry with update(current_entry_or_None)"""
+        with self._write():
+            # The satellite is only added once update() has returned
+            entry = update(self.data.get(satellite_name, {}).get(data_type))
+            self._put(satellite_name, data_type, entry)
+            return entry
+
+    def upsert_many(self, rows):
+        """Insert or replace many (satellite_name, data_type, entry) rows in one file rewrite"""
+        rows = list(rows)
+        with self._write():
+            for satellite_name, data_type, entry in rows:
+                self._put(satellite_name, data_type, entry)
+
+    def delete(self, satellite_name):
+        """Delete a satellite, returning whether it existed"""
+        with self._lock, file_lock(self.lock_path):
+            self.refresh()
+            if satellite_name not in self.data:
+                return False
+            del self.data[satellite_name]
+            self.save()
+            if self._keys.get(name_key(satellite_name)) == satellite_name:
+                # Another spelling with the same key may now be the first one
+                self._index_names()
+            return True
+
+    def names(self):
+        """List satellite names in insertion order"""
+        self.refresh()
+        return list(self.data.keys())
+
+    def find_name(self, key):
+        """Stored satellite name with this name_key (the first stored one), or None"""
+        self.refresh()
+        return self._keys.get(key)
+
+    def iter_records(self):
+        """Yield (satellite_name, entries) pairs"""
+        self.refresh()
+        for satellite_name, entries in list(self.data.items()):
+            yield satellite_name, entries
+
+    def iter_timestamps(self):
+        """Yield (satellite_name, data_type, last_updated) for every entry"""
+        for satellite_name, entries in self.iter_records():
+            for data_type, entry in entries.items():
+                yield satellite_name, data_type, (entry or {}).get("last_updated")
+
+    def changes_since(self, version, since):
+        """None: the JSON file keeps no change log, so callers re-read the whole store"""
+        return None
+
+    def aliases(self):
+        """Alias -> satellite name table, re-read only when the sidecar file changes"""
+        stamp = _stat_stamp(self.alias_path)
+        cached_stamp, aliases = self._alias_cache
+        if stamp != cached_stamp:
+            aliases = {}
+            if stamp is not None:
+                with open(self.alias_path, 'r') as f:
+                    aliases = json.load(f)
+            self._alias_cache = (stamp, aliases)
+        return aliases
+
+    def alias(self, alias):
+        """Satellite name an alias points at, or None"""
+        return self.aliases().get(alias)
+
+    def set_aliases(self, pairs):
+        """Point each (alias, satellite_name) pair's alias at that satellite"""
+        with self._lock, file_lock(self.lock_path):
+            aliases = dict(self.aliases())
+            aliases.update(pairs)
+            _write_json_atomic(self.alias_path, aliases)
+
+
+class SqliteStore:
+    """Storage engine that keeps one row per (satellite, data type) in SQLite
+
+    The database runs in WAL mode so readers never block the single writer,
+    and every write bumps a version counter in store_meta that other
+    processes use to invalidate their cached name list. Writes also keep
+    each satellite's name_key in satellite_keys, so resolving a spelling is
+    one indexed lookup however large the store is.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS satellite_data (
+            satellite_name TEXT NOT NULL,
+            data_type TEXT NOT NULL,
+            entry TEXT NOT NULL,
+            last_updated TEXT,
+            PRIMARY KEY (satellite_name, data_type)
+        );
+        -- The primary key already serves lookups by satellite name
+        CREATE INDEX IF NOT EXISTS idx_satellite_data_type ON satellite_data (data_type);
+        CREATE INDEX IF NOT EXISTS idx_satellite_data_updated ON satellite_data (last_updated);
+        CREATE TABLE IF NOT EXISTS store_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+        -- name_key of a spelling, or norad:<number>, -> stored satellite name
+        CREATE TABLE IF NOT EXISTS satellite_aliases (
+            alias TEXT PRIMARY KEY,
+            satellite_name TEXT NOT NULL
+        );
+        -- name_key of every stored satellite; rowid order is storage order
+        CREATE TABLE IF NOT EXISTS satellite_keys (
+            satellite_name TEXT PRIMARY KEY,
+            name_key TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_satellite_keys_key ON satellite_keys (name_key);
+        -- Deleted satellites with the version that deleted them, so caches can drop them
+        CREATE TABLE IF NOT EXISTS deleted_satellites (
+            satellite_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        );
+    """
+
+    # Adds the satellite_keys rows missing for stored satellites, oldest first
+    INDEX_NAMES = """
+        INSERT OR IGNORE INTO satellite_keys (satellite_name, name_key)
+        SELECT satellite_name, name_key(satellite_name) FROM satellite_data
+        GROUP BY satellite_name ORDER BY MIN(rowid)
+    """
+
+    def __init__(self, path=DEFAULT_DB_FILE):
+        self.path = path
+        self._names_cache = (None, [])
+        self._db = SqliteConnections(path, self.SCHEMA, functions=[("name_key", 1, name_key)])
+        self._index_names()
+
+    def _index_names(self):
+        """Fill satellite_keys once for a database written before it existed"""
+        if self.get_meta("name_keys_indexed") is not None:
+            return
+        with self._transaction() as conn:
+            conn.execute(self.INDEX_NAMES)
+            conn.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES ('name_keys_indexed', '1')")
+
+    @contextmanager
+    def _transaction(self):
+        """Run a write transaction that also bumps the store version"""
+        conn = self._db.get()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute(
+                """
+                INSERT INTO store_meta (key, value) VALUES ('version', '1')
+                ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+                """
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def version(self):
+        """Change token that increases with every committed write from any process"""
+        return int(self.get_meta("version") or 0)
+
+    def get(self, satellite_name):
+        """Get every entry stored for a satellite"""
+        rows = self._db.get().execute(
+            "SELECT data_type, entry FROM satellite_data WHERE satellite_name = ? ORDER BY rowid",
+            (satellite_name,)
+        ).fetchall()
+        if not rows:
+            return None
+        return {data_type: json.loads(entry) for data_type, entry in rows}
+
+    def get_entry(self, satellite_name, data_type):
+        """Get a single data type entry for a satellite"""
+        row = self._db.get().execute(
+            "SELECT entry FROM satellite_data WHERE satellite_name = ? AND data_type = ?",
+            (satellite_name, data_type)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    UPSERT = """
+        INSERT INTO satellite_data (satellite_name, data_type, entry, last_updated)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (satellite_name, data_type)
+        DO UPDATE SET entry = excluded.entry, last_updated = excluded.last_updated
+    """
+
+    INSERT_KEY = "INSERT OR IGNORE INTO satellite_keys (satellite_name, name_key) VALUES (?, ?)"
+
+    @classmethod
+    def _upsert_row(cls, conn, satellite_name, data_type, entry):
+        conn.execute(cls.UPSERT, (satellite_name, data_type, json.dumps(entry), entry.get("last_updated")))
+        conn.execute(cls.INSERT_KEY, (satellite_name, name_key(satellite_name)))
+
+    def upsert(self, satellite_name, data_type, entry):
+        """Insert or replace a single data type entry"""
+        with self._transaction() as conn:
+            self._upsert_row(conn, satellite_name, data_type, entry)
+
+    def update_entry(self, satellite_name, data_type, update):
+        """Atomically replace an entry with update(current_entry_or_None)"""
+        with self._transaction() as conn:
+            # BEGIN IMMEDIATE holds the write lock, so nobody changes the row in between
+            entry = update(self.get_entry(satellite_name, data_type))
+            self._upsert_row(conn, satellite_name, data_type, entry)
+            return entry
+
+    def upsert_many(self, rows):
+        """Insert or replace many (satellite_name, data_type, entry) rows in one transaction"""
+        rows = list(rows)
+        with self._transaction() as conn:
+            conn.executemany(
+                self.UPSERT,
+                [
+                    (satellite_name, data_type, json.dumps(entry), entry.get("last_updated"))
+                    for satellite_name, data_type, entry in rows
+                ]
+            )
+            names = dict.fromkeys(satellite_name for satellite_name, _, _ in rows)
+            conn.executemany(self.INSERT_KEY, [(name, name_key(name)) for name in names])
+
+    def delete(self, satellite_name):
+        """Delete a satellite, returning whether it existed"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "DELETE FROM satellite_data WHERE satellite_name = ?", (satellite_name,)
+            )
+            conn.execute("DELETE FROM satellite_keys WHERE satellite_name = ?", (satellite_name,))
+            if cursor.rowcount > 0:
+                # The transaction commits with the version one past the current one
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO deleted_satellites (satellite_name, version)
+                    SELECT ?, COALESCE(MAX(CAST(value AS INTEGER)), 0) + 1 FROM store_meta WHERE key = 'version'
+                    """,
+                    (satellite_name,)
+                )
+        return cursor.rowcount > 0
+
+    def names(self):
+        """List satellite names in insertion order, cached until the store version changes"""
+        version = self.version()
+        cached_version, cached_names = self._names_cache
+        if cached_version == version:
+            return list(cached_names)
+        rows = self._db.get().execute(
+            "SELECT satellite_name FROM satellite_data GROUP BY satellite_name ORDER BY MIN(rowid)"
+        ).fetchall()
+        names = [row[0] for row in rows]
+        self._names_cache = (version, names)
+        return list(names)
+
+    def iter_records(self):
+        """Yield (satellite_name, entries) pairs without loading the whole table"""
+        cursor = self._db.get().cursor()
+        cursor.execute(
+            "SELECT satellite_name, data_type, entry FROM satellite_data ORDER BY satellite_name, rowid"
+        )
+        current_name, entries = None, {}
+        for satellite_name, data_type, entry in cursor:
+            if satellite_name != current_name:
+                if current_name is not None:
+                    yield current_name, entries
+                current_name, entries = satellite_name, {}
+            entries[data_type] = json.loads(entry)
+        if current_name is not None:
+            yield current_name, entries
+
+    def iter_timestamps(self):
+        """Yield (satellite_name, data_type, last_updated) for every entry without decoding any"""
+        yield from self._db.get().execute(
+            "SELECT satellite_name, data_type, last_updated FROM satellite_data"
+        )
+
+    def changes_since(self, version, since):
+        """What changed after an earlier version() whose newest entry was written at since
+
+        Returns (rows, deleted): (satellite_name, data_type, last_updated) of
+        entries with last_updated after since, read through the last_updated
+        index, and the names of satellites deleted after version.
+        """
+        conn = self._db.get()
+        rows = conn.execute(
+            "SELECT satellite_name, data_type, last_updated FROM satellite_data WHERE last_updated > ?", (since,)
+        ).fetchall()
+        deleted = [
+            row[0] for row in conn.execute(
+                "SELECT satellite_name FROM deleted_satellites WHERE version > ?", (version,)
+            )
+        ]
+        return rows, deleted
+
+    def find_name(self, key):
+        """Stored satellite name with this name_key (the first stored one), or None"""
+        row = self._db.get().execute(
+            "SELECT satellite_name FROM satellite_keys WHERE name_key = ? ORDER BY rowid LIMIT 1", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def alias(self, alias):
+        """Satellite name an alias points at, or None"""
+        row = self._db.get().execute(
+            "SELECT satellite_name FROM satellite_aliases WHERE alias = ?", (alias,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_aliases(self, pairs):
+        """Point each (alias, satellite_name) pair's alias at that satellite"""
+        with self._transaction() as conn:
+            conn.executemany(
+                """
+                INSERT INTO satellite_aliases (alias, satellite_name) VALUES (?, ?)
+                ON CONFLICT (alias) DO UPDATE SET satellite_name = excluded.satellite_name
+                """,
+                list(pairs)
+            )
+
+    def get_meta(self, key):
+        row = self._db.get().execute(
+            "SELECT value FROM store_meta WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def migrate_from_json(self, json_path):
+        """One-shot import of an existing JSON store; returns the number of satellites imported"""
+        if self.get_meta("json_migrated_from") is not None or not os.path.exists(json_path):
+            return 0
+        with open(json_path, 'r') as f:
+            data = json.load(f)
+
+        with self._transaction() as conn:
+            # Another process may have finished the migration while we waited for the lock
+            if self.get_meta("json_migrated_from") is not None:
+                return 0
+            conn.executemany(
+                """
+                INSERT INTO satellite_data (satellite_name, data_type, entry, last_updated)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (satellite_name, data_type) DO NOTHING
+                """,
+                [
+                    (satellite_name, data_type, json.dumps(entry), entry.get("last_updated"))
+                    for satellite_name, entries in data.items()
+                    for data_type, entry in entries.items()
+                ]
+            )
+            conn.execute(self.INDEX_NAMES)
+            conn.execute(
+                "INSERT OR REPLACE INTO store_meta (key, value) VALUES (?, ?)",
+                ("json_migrated_from", os.path.abspath(json_path))
+            )
+        # stderr, so the CLI tools' stdout stays pure JSONL / CSV / JSON
+        print(f"Migrated {len(data)} satellites from {json_path} into {self.path}", file=sys.stderr)
+        return len(data)
+
+
+def _merge_entry(entry, data, fields, now):
+    """Build the stored entry for new data, merging only fields into entry when given
+
+    With fields, other stored fields keep their values and timestamps.
+    """
+    if fields is None or entry is None:
+        merged = dict(data)
+        field_updated = {}
+        changed = merged.keys() if fields is None else [field for field in fields if field in data]
+    else:
+        merged = dict(entry.get("data") or {})
+        # Fields written before per-field timestamps keep the entry's old timestamp
+        field_updated = {field: entry.get("last_updated") for field in merged}
+        field_updated.update(entry.get("field_updated") or {})
+        changed = [field for field in fields if field in data]
+        merged.update({field: data[field] for field in changed})
+    field_updated.update({field: now for field in changed})
+    return {"data": merged, "last_updated": now, "field_updated": field_updated}
+
+
+class SatelliteDataManager:
+    """Satellite records keyed by a canonical name
+
+    Every name passed in is resolved first: a NORAD number or a registered
+    alias maps to its satellite, and any spelling whose name_key matches a
+    stored satellite maps to that record. So "Starlink-1" reads and writes
+    the "STARLINK 1" record instead of starting a second one. Names matching
+    nothing are stored as given (with whitespace tidied) and become the
+    canonical spelling.
+    """
+
+    def __init__(self, backend=None, path=None, json_file=DEFAULT_JSON_FILE):
+        # SATELLITE_STORE_BACKEND=json keeps the original single-file format
+        self.backend = backend or config.get("SATELLITE_STORE_BACKEND", "sqlite")
+        if self.backend == "sqlite":
+            self.data_file = path or config.get("SATELLITE_DB_PATH", DEFAULT_DB_FILE)
+            self.store = SqliteStore(self.data_file)
+            self.store.migrate_from_json(json_file)
+        elif self.backend == "json":
+            self.data_file = path or json_file
+            self.store = JsonStore(self.data_file)
         else:
-            self.data = {}
+            raise ValueError(f"Unknown storage backend: {self.backend}")
+
+    @property
+    def data(self):
+        """Full store as a nested dict (materializes every record)"""
+        return dict(self.store.iter_records())
+
+    def load_data(self):
+        """Reload data from the underlying store"""
+        if isinstance(self.store, JsonStore):
+            self.store.load()
 
     def save_data(self):
-        """Save data to JSON file"""
-        with open(self.data_file, 'w') as f:
-            json.dump(self.data, f, indent=4)
-
-    def append_satellite_data(self, satellite_name, data_type, data):
-        """Append or update satellite data"""
-        if satellite_name not in self.data:
-            self.data[satellite_name] = {}
-        
-        self.data[satellite_name][data_type] = {
-            "data": data,
-            "last_updated": datetime.now().isoformat()
-        }
-        self.save_data()
+        """Persist pending changes (writes are already persisted per call)"""
+        if isinstance(self.store, JsonStore):
+            self.store.save()
+
+    def resolve_name(self, satellite_name):
+        """Canonical stored name for a spelling, alias or NORAD number of a satellite
+
+        A few indexed lookups, independent of the store size.
+        """
+        text = " ".join(str(satellite_name).split())
+        number = norad_id(text)
+        if number is not None:
+            canonical = self.store.alias(norad_alias(number))
+            if canonical is not None:
+                return canonical
+        key = name_key(text)
+        return self.store.alias(key) or self.store.find_name(key) or text
+
+    def add_alias(self, satellite_name, *aliases):
+        """Make each alias (another name or spelling) resolve to satellite_name"""
+        canonical = self.resolve_name(satellite_name)
+        self.store.set_aliases([(name_key(alias), canonical) for alias in aliases])
+        return canonical
+
+    def set_norad_id(self, satellite_name, number):
+        """Make the NORAD catalog number resolve to satellite_name"""
+        canonical = self.resolve_name(satellite_name)
+        self.store.set_aliases([(norad_alias(number), canonical)])
+        return canonical
+
+    def import_catalog(self, path):
+        """Register NORAD numbers from a catalog CSV; returns the number of entries read
+
+        Accepts CelesTrak SATCAT exports (OBJECT_NAME, NORAD_CAT_ID) or
+        satellite_name, norad_id columns. Satellites already stored keep their
+        spelling; others will be stored under the catalog name.
+        """
+        pairs, count = [], 0
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                name = (row.get("OBJECT_NAME") or row.get("satellite_name") or "").strip()
+                number = (row.get("NORAD_CAT_ID") or row.get("norad_id") or "").strip()
+                if not name or not number.isdigit():
+                    continue
+                count += 1
+                canonical = self.resolve_name(name)
+                pairs.append((norad_alias(number), canonical))
+                if name_key(canonical) != name_key(name):
+                    pairs.append((name_key(name), canonical))
+        if pairs:
+            self.store.set_aliases(pairs)
+        return count
+
+    def merge_duplicates(self):
+        """Fold records whose names share a name_key into the first stored one
+
+        For each data type the most recently updated entry is kept, and the
+        other spellings are deleted. Returns the names removed.
+        """
+        groups = {}
+        for name in self.store.names():
+            groups.setdefault(name_key(name), []).append(name)
+        removed = []
+        for names in groups.values():
+            if len(names) < 2:
+                continue
+            canonical = names[0]
+            merged = dict(self.store.get(canonical) or {})
+            for other in names[1:]:
+                for data_type, entry in (self.store.get(other) or {}).items():
+                    current = merged.get(data_type)
+                    if current is None or (entry.get("last_updated") or "") > (current.get("last_updated") or ""):
+                        merged[data_type] = entry
+            self.store.upsert_many([(canonical, data_type, entry) for data_type, entry in merged.items()])
+            for other in names[1:]:
+                self.store.delete(other)
+                removed.append(other)
+        return removed
+
+    def append_satellite_data(self, satellite_name, data_type, data, fields=None):
+        """Append or update satellite data
+
+        With fields, only those keys of data are merged into the stored entry and
+        only their per-field timestamps move; other fields keep their values.
+        """
+        satellite_name = self.resolve_name(satellite_name)
+        now = datetime.now().isoformat()
+
+        def update(entry):
+            return _merge_entry(entry, data, fields, now)
+
+        with span("append_satellite_data", "store", satellite=satellite_name, data_type=data_type):
+            self.store.update_entry(satellite_name, data_type, update)
+
+    def append_many(self, records):
+        """Write many (satellite_name, data_type, data) results in a single store write
+
+        Each result replaces the stored entry, as append_satellite_data does
+        without fields, but the batch costs one transaction (or one JSON file
+        rewrite) instead of one per result.
+        """
+        now = datetime.now().isoformat()
+        rows = [
+            (self.resolve_name(satellite_name), data_type, _merge_entry(None, data, None, now))
+            for satellite_name, data_type, data in records
+        ]
+        if rows:
+            with span("append_many", "store", records=len(rows)):
+                self.store.upsert_many(rows)
+        return len(rows)
 
     def get_satellite_data(self, satellite_name, data_type=None):
         """Get satellite data for a specific satellite and optionally a specific data type"""
-        if satellite_name not in self.data:
-            return None
-        
+        satellite_name = self.resolve_name(satellite_name)
         if data_type:
-            return self.data[satellite_name].get(data_type)
-        return self.data[satellite_name]
+            return self.store.get_entry(satellite_name, data_type)
+        return self.store.get(satellite_name)
 
     def get_all_satellites(self):
         """Get a list of all satellites in the database"""
-        return list(self.data.keys())
+        return self.store.names()
+
+    def iter_satellites(self):
+        """Iterate over (satellite_name, entries) pairs without loading the whole store"""
+        return self.store.iter_records()
+
+    def iter_timestamps(self):
+        """Iterate over (satellite_name, data_type, last_updated) of every stored entry
+
+        Much cheaper than iter_satellites on SQLite, which then decodes no entries.
+        """
+        return self.store.iter_timestamps()
+
+    def changes_since(self, version, since):
+        """Entries written after since and satellites deleted after version, or None
+
+        version is an earlier version() and since the newest last_updated seen
+        then. None means the store can't tell (the JSON backend) and the
+        caller has to re-read it.
+        """
+        return self.store.changes_since(version, since)
+
+    def export_json(self):
+        """Serialize the whole store in the original satellite_data.json layout"""
+        return json.dumps(self.data, indent=4)
+
+    def version(self):
+        """Change token for the store; differs after any write from any process"""
+        return self.store.version()
 
     def delete_satellite_data(self, satellite_name):
-        """Delete all data for a specific satellite"""
-        if satellite_name in self.data:
-            del self.data[satellite_name]
-            self.save_data()
-            return True
-        return False
+        """Delete all data for a specific satellite (its aliases stay registered)"""
+        return self.store.delete(self.resolve_name(satellite_name))
+
+
+_shared_manager = None
+_shared_manager_lock = threading.Lock()
+
+
+def get_data_manager():
+    """Return the process-wide SatelliteDataManager shared by the bots and the app"""
+    global _shared_manager
+    with _shared_manager_lock:
+        if _shared_manager is None:
+            _shared_manager = SatelliteDataManager()
+        return _shared_manager
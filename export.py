@@ -0,0 +1,144 @@
+import argparse
+import csv
+import importlib.util
+import io
+import json
+import sys
+from functools import partial
+
+from data_manager import get_data_manager
+from flatten import column_order, flatten_record
+
+CHUNK_SIZE = 1000
+
+# Parquet export is optional; pyarrow is only imported when a Parquet file is written
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+# Download formats and their MIME types; Parquet only when pyarrow is installed
+EXPORT_FORMATS = {"json": "application/json", "csv": "text/csv"}
+if HAS_PYARROW:
+    EXPORT_FORMATS["parquet"] = "application/vnd.apache.parquet"
+
+
+def export_columns(data_manager):
+    """First pass: the full, stable column list of the flattened store
+
+    Only column names are kept, so memory does not grow with the number of satellites.
+    """
+    columns = set()
+    for satellite_name, entries in data_manager.iter_satellites():
+        columns.update(flatten_record(satellite_name, entries))
+    return column_order(columns)
+
+
+def iter_rows(data_manager, columns):
+    """Second pass: one flat row per satellite, with a value (or None) for every column"""
+    for satellite_name, entries in data_manager.iter_satellites():
+        row = flatten_record(satellite_name, entries)
+        yield [row.get(column) for column in columns]
+
+
+def iter_chunks(rows, chunk_size=CHUNK_SIZE):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _text(value):
+    # Values differ in type between satellites ("NA" vs numbers), so every column is text
+    if value is None:
+        return None
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+
+def write_csv(data_manager, f, chunk_size=CHUNK_SIZE):
+    """Stream the store as CSV into a text file object; returns the number of rows"""
+    columns = export_columns(data_manager)
+    writer = csv.writer(f)
+    writer.writerow(columns)
+    count = 0
+    for chunk in iter_chunks(iter_rows(data_manager, columns), chunk_size):
+        writer.writerows([["" if value is None else _text(value) for value in row] for row in chunk])
+        f.flush()
+        count += len(chunk)
+    return count
+
+
+def write_parquet(data_manager, where, chunk_size=CHUNK_SIZE):
+    """Stream the store as Parquet, one row group per chunk; where is a path or binary file object"""
+    if not HAS_PYARROW:
+        raise RuntimeError("Parquet export needs pyarrow: pip install pyarrow")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    columns = export_columns(data_manager)
+    schema = pa.schema([(column, pa.string()) for column in columns])
+    count = 0
+    with pq.ParquetWriter(where, schema) as writer:
+        for chunk in iter_chunks(iter_rows(data_manager, columns), chunk_size):
+            arrays = [pa.array([_text(row[index]) for row in chunk], pa.string()) for index in range(len(columns))]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            count += len(chunk)
+    return count
+
+
+def write_json(data_manager, f):
+    """Stream the store in the satellite_data.json layout, one satellite at a time; returns the count"""
+    f.write("{")
+    count = 0
+    for satellite_name, entries in data_manager.iter_satellites():
+        f.write(("," if count else "") + "\n    " + json.dumps(satellite_name) + ": ")
+        f.write(json.dumps(entries, indent=4).replace("\n", "\n    "))
+        count += 1
+    f.write("\n}\n")
+    return count
+
+
+def export_bytes(data_manager, file_format):
+    """The whole export as bytes, e.g. for a download button"""
+    if file_format == "parquet":
+        buffer = io.BytesIO()
+        write_parquet(data_manager, buffer)
+        return buffer.getvalue()
+    buffer = io.StringIO()
+    if file_format == "csv":
+        write_csv(data_manager, buffer)
+    elif file_format == "json":
+        write_json(data_manager, buffer)
+    else:
+        raise ValueError(f"Unknown export format: {file_format}")
+    return buffer.getvalue().encode("utf-8")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the satellite store as CSV, Parquet or JSON")
+    parser.add_argument("--format", choices=["csv", "parquet", "json"], default="csv")
+    parser.add_argument("-o", "--output", default="-", help="Output file, or - for stdout (CSV and JSON only)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows per written chunk / row group")
+    args = parser.parse_args(argv)
+
+    data_manager = get_data_manager()
+    if args.format == "parquet":
+        if args.output == "-":
+            parser.error("Parquet output needs a file: use --output")
+        count = write_parquet(data_manager, args.output, args.chunk_size)
+    else:
+        write = partial(write_csv, chunk_size=args.chunk_size) if args.format == "csv" else write_json
+        if args.output == "-":
+            count = write(data_manager, sys.stdout)
+        else:
+            with open(args.output, "w", newline="") as f:
+                count = write(data_manager, f)
+    print(f"Exported {count} satellites", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from bots import FailedLookup
+from refresh import field_schemas, is_missing
+from research import (
+    ResearchCorpus, agather_corpus, aget_corpus, gather_corpus, get_corpus, prefetch_enabled, research_queries
+)
+from tracing import span, trace_run
+
+
+class FastPathExtractor:
+    """Fill a bot's schema with concurrent searches and one structured LLM call
+
+    The ReAct agent needs many serial LLM round trips per satellite. This
+    runs the bot's category query (plus one query per requested field when
+    only some fields are wanted) concurrently with the shared research pass,
+    skipping queries that pass already covers, asks the LLM once to extract
+    every field from the results, and only hands the fields that come back
+    empty to the agent.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    def _queries(self, satellite_name, groups, targeted):
+        queries = [self.bot._create_search_query(satellite_name)]
+        if targeted:
+            schemas = {schema.name: schema for schema in self.bot.response_schema}
+            queries += [f'"{satellite_name}" satellite {schemas[group].description}' for group in groups]
+        return queries
+
+    def _own_queries(self, satellite_name, queries, shared):
+        """The queries the shared research pass does not already run"""
+        if shared is not None:
+            covered = shared.queries
+        elif prefetch_enabled():
+            covered = set(research_queries(satellite_name))
+        else:
+            covered = set()
+        return [query for query in queries if query not in covered]
+
+    def _gather(self, satellite_name, queries, corpus):
+        """(shared corpus, results of the bot's own queries), fetched concurrently"""
+        own = self._own_queries(satellite_name, queries, corpus)
+        if corpus is not None or not prefetch_enabled():
+            return corpus, gather_corpus(satellite_name, own) if own else ResearchCorpus(satellite_name)
+        if not own:
+            return get_corpus(satellite_name), ResearchCorpus(satellite_name)
+        # The worker runs in a copy of this context so the shared pass joins the caller's trace
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            shared = executor.submit(contextvars.copy_context().run, get_corpus, satellite_name)
+            found = gather_corpus(satellite_name, own)
+            return shared.result(), found
+
+    async def _agather(self, satellite_name, queries, corpus):
+        """Async version of _gather"""
+        own = self._own_queries(satellite_name, queries, corpus)
+        if corpus is not None or not prefetch_enabled():
+            return corpus, await agather_corpus(satellite_name, own) if own else ResearchCorpus(satellite_name)
+        if not own:
+            return await aget_corpus(satellite_name), ResearchCorpus(satellite_name)
+        shared, found = await asyncio.gather(aget_corpus(satellite_name), agather_corpus(satellite_name, own))
+        return shared, found
+
+    def _corpus(self, satellite_name, shared, found):
+        corpus = ResearchCorpus(satellite_name)
+        for document in (shared.documents if shared else []) + found.documents:
+            corpus.add(document)
+        return corpus
+
+    def _prompt(self, satellite_name, corpus, parser):
+        return f"""
+Extract information about the satellite "{satellite_name}" from the numbered search results below.
+
+{corpus.to_prompt()}
+
+Rules:
+- Only use facts stated in the search results; do not guess
+- Use the URL of the result a fact came from as its source
+- Use "NA" for any field the results do not answer
+
+{parser.get_format_instructions()}
+"""
+
+    def _parser(self, groups):
+        # LangChain is imported on first use, so importing this module stays cheap for the UI
+        from langchain.output_parsers import StructuredOutputParser
+        schemas = field_schemas(self.bot.response_schema, self.bot.FIELD_GROUPS, groups)
+        return StructuredOutputParser.from_response_schemas(schemas)
+
+    def _config(self, satellite_name):
+        from metrics_callbacks import MetricsCallbackHandler
+        return {"callbacks": [MetricsCallbackHandler(type(self.bot).__name__, satellite_name)]}
+
+    def _parse(self, response, parser):
+        try:
+            return parser.parse(response.content)
+        except Exception as e:
+            print(f"Fast path could not parse the LLM output: {str(e)}")
+            return {}
+
+    def _merge(self, result, fallback, groups, missing):
+        """Fill missing groups from the agent; still empty after a failed agent lookup is a FailedLookup"""
+        for group in missing:
+            if not is_missing(fallback.get(group)):
+                for field in self.bot.FIELD_GROUPS[group]:
+                    if field in fallback:
+                        result[field] = fallback[field]
+        for group in groups:
+            for field in self.bot.FIELD_GROUPS[group]:
+                result.setdefault(field, "NA")
+        if isinstance(fallback, FailedLookup) and all(is_missing(result.get(group)) for group in groups):
+            return FailedLookup(result, fallback.reason)
+        return result
+
+    def extract(self, satellite_name, fields=None, corpus=None):
+        """Return the bot's output dict for a satellite, using the agent only for gaps"""
+        with trace_run(f"{type(self.bot).__name__} {satellite_name} fast path"):
+            groups = list(fields or self.bot.FIELD_GROUPS)
+            parser = self._parser(groups)
+            shared, found = self._gather(satellite_name, self._queries(satellite_name, groups, bool(fields)), corpus)
+            corpus = self._corpus(satellite_name, shared, found)
+
+            try:
+                with span("fast_path_llm", "llm"):
+                    response = self.bot.llm.invoke(
+                        self._prompt(satellite_name, corpus, parser), config=self._config(satellite_name)
+                    )
+                with span("parse_output", "parse"):
+                    result = self._parse(response, parser)
+            except Exception as e:
+                print(f"Fast path LLM call failed: {str(e)}")
+                result = {}
+
+            missing = [group for group in groups if is_missing(result.get(group))]
+            fallback = {}
+            if missing:
+                print(f"Fast path left {', '.join(missing)} empty; falling back to the agent")
+                fallback = self.bot.process_satellite(satellite_name, corpus=corpus, fields=missing)
+            result = self._merge(result, fallback, groups, missing)
+            result["satellite_name"] = satellite_name
+            return result
+
+    async def aextract(self, satellite_name, fields=None, corpus=None):
+        """Async version of extract"""
+        with trace_run(f"{type(self.bot).__name__} {satellite_name} fast path"):
+            groups = list(fields or self.bot.FIELD_GROUPS)
+            parser = self._parser(groups)
+            shared, found = await self._agather(
+                satellite_name, self._queries(satellite_name, groups, bool(fields)), corpus
+            )
+            corpus = self._corpus(satellite_name, shared, found)
+
+            try:
+                with span("fast_path_llm", "llm"):
+                    response = await self.bot.llm.ainvoke(
+                        self._prompt(satellite_name, corpus, parser), config=self._config(satellite_name)
+                    )
+                with span("parse_output", "parse"):
+                    result = self._parse(response, parser)
+            except Exception as e:
+                print(f"Fast path LLM call failed: {str(e)}")
+                result = {}
+
+            missing = [group for group in groups if is_missing(result.get(group))]
+            fallback = {}
+            if missing:
+                print(f"Fast path left {', '.join(missing)} empty; falling back to the agent")
+                fallback = await self.bot.aprocess_satellite(satellite_name, corpus=corpus, fields=missing)
+            result = self._merge(result, fallback, groups, missing)
+            result["satellite_name"] = satellite_name
+            return result
+
+
+def extract(bot, satellite_name, fields=None, corpus=None):
+    """Run the fast path for a bot"""
+    return FastPathExtractor(bot).extract(satellite_name, fields=fields, corpus=corpus)
+
+
+async def aextract(bot, satellite_name, fields=None, corpus=None):
+    """Async version of extract"""
+    return await FastPathExtractor(bot).aextract(satellite_name, fields=fields, corpus=corpus)
@@ -0,0 +1,50 @@
+import json
+
+from bots import DATA_TYPES
+
+KEY_COLUMN = "satellite_name"
+SEPARATOR = "."
+
+
+def flatten_value(value, prefix, out):
+    """Flatten nested dicts into prefix.key columns; lists are kept as JSON text"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            flatten_value(item, f"{prefix}{SEPARATOR}{key}", out)
+    elif isinstance(value, (list, tuple)):
+        out[prefix] = json.dumps(value)
+    else:
+        out[prefix] = value
+    return out
+
+
+def flatten_section(data_type, data):
+    """Columns for one bot output, prefixed with its data type so sections never collide"""
+    out = {}
+    for key, value in (data or {}).items():
+        # Every bot output repeats the satellite name, which already has its own column
+        if key == KEY_COLUMN:
+            continue
+        flatten_value(value, f"{data_type}{SEPARATOR}{key}", out)
+    return out
+
+
+def flatten_record(satellite_name, entries, data_types=DATA_TYPES):
+    """One flat row for a satellite from its stored entries ({data_type: {"data", "last_updated", ...}})"""
+    row = {KEY_COLUMN: satellite_name}
+    for data_type in data_types:
+        entry = (entries or {}).get(data_type)
+        if not entry:
+            continue
+        row[f"{data_type}{SEPARATOR}last_updated"] = entry.get("last_updated")
+        row.update(flatten_section(data_type, entry.get("data")))
+    return row
+
+
+def column_order(columns, data_types=DATA_TYPES):
+    """Stable column order: the key column, then sections in DATA_TYPES order, then names"""
+    def sort_key(column):
+        section = column.split(SEPARATOR, 1)[0]
+        rank = data_types.index(section) if section in data_types else len(data_types)
+        return rank, column
+    return [KEY_COLUMN] + sorted((column for column in columns if column != KEY_COLUMN), key=sort_key)
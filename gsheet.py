@@ -0,0 +1,302 @@
+import json
+import re
+import threading
+import time
+
+import config
+from flatten import KEY_COLUMN, SEPARATOR, column_order, flatten_record
+from rate_limiter import RateLimiter
+
+# gspread's Worksheet.update takes (range_name, values) in 5.x and (values, range_name)
+# in 6.x, so every call here passes both by keyword
+
+# Sheets allows 60 write requests per minute per user; stay under it by default
+SHEETS_WRITES_PER_MINUTE = int(config.get("SHEETS_WRITES_PER_MINUTE", "50"))
+# Cells (including skipped ones) per batch_update request, keeping payloads well under the 2 MB limit
+SHEETS_MAX_CELLS_PER_REQUEST = int(config.get("SHEETS_MAX_CELLS_PER_REQUEST", "20000"))
+
+sheets_rate_limiter = RateLimiter(requests_per_minute=SHEETS_WRITES_PER_MINUTE)
+
+
+def column_letter(index):
+    """1-based column index to A1 letters (1 -> A, 27 -> AA)"""
+    letters = ""
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def cell_value(value):
+    """Sheet cell value for a bot output value; nested values are stored as JSON"""
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def cell_text(value):
+    """How a written value reads back from get_all_values, for diffing"""
+    value = cell_value(value)
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def ensure_columns(worksheet, count):
+    """Grow the worksheet grid to at least count columns; writes past the grid are rejected"""
+    col_count = getattr(worksheet, "col_count", None)
+    if col_count is not None and col_count < count:
+        worksheet.add_cols(count - col_count)
+
+
+def legacy_renames(headers, columns):
+    """{header index: column} for headers left by the old unprefixed upload layout
+
+    Sheets uploaded before columns were named <data type>.<field> have bare
+    field names as headers. Each one that matches exactly one wanted column's
+    field is renamed to that column, so its cells are updated in place rather
+    than duplicated under a new header.
+    """
+    by_field = {}
+    for column in columns:
+        _, _, field = column.partition(SEPARATOR)
+        if field:
+            by_field.setdefault(field, []).append(column)
+    renames = {}
+    for index, header in enumerate(headers):
+        matches = by_field.get(header, [])
+        if header != KEY_COLUMN and len(matches) == 1 and matches[0] not in headers:
+            renames[index] = matches[0]
+    return renames
+
+
+def header_update(old_headers, headers, renames):
+    """Range and values writing renamed and new header cells, None for the untouched ones"""
+    first = min(list(renames) + [len(old_headers)])
+    values = [
+        headers[index] if index in renames or index >= len(old_headers) else None
+        for index in range(first, len(headers))
+    ]
+    return f"{column_letter(first + 1)}1:{column_letter(len(headers))}1", values
+
+
+class SheetUpserter:
+    """Writes one row per satellite into a worksheet, updating it in place on later uploads
+
+    The header row and a satellite name -> row number index are read once and
+    cached for index_ttl seconds, so an upsert costs a single write request
+    (plus one when new columns appear) instead of re-reading and rewriting the
+    whole sheet. Cells for columns the data doesn't mention are left as they are.
+    """
+
+    def __init__(self, worksheet, key_column=KEY_COLUMN, index_ttl=300, rate_limiter=None):
+        self.worksheet = worksheet
+        self.key_column = key_column
+        self.index_ttl = index_ttl
+        self.rate_limiter = rate_limiter or sheets_rate_limiter
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self.headers = []
+        self.rows = {}
+        self.last_row = 1
+
+    def invalidate(self):
+        """Forget the cached header and row index"""
+        with self._lock:
+            self._loaded_at = None
+
+    def _load(self):
+        self.headers = self.worksheet.row_values(1)
+        self.rows = {}
+        self.last_row = 1
+        if self.key_column in self.headers:
+            names = self.worksheet.col_values(self.headers.index(self.key_column) + 1)
+            for row, name in enumerate(names[1:], start=2):
+                # The first row wins if earlier full-sheet uploads left duplicates
+                if name:
+                    self.rows.setdefault(name, row)
+            self.last_row = max(1, len(names))
+        self._loaded_at = time.monotonic()
+
+    def _ensure_loaded(self):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.index_ttl:
+            self._load()
+
+    def _ensure_headers(self, keys):
+        """Rename legacy headers and add missing columns, writing only the changed header cells"""
+        wanted = [self.key_column] + [key for key in keys if key != self.key_column]
+        renames = legacy_renames(self.headers, wanted)
+        headers = list(self.headers)
+        for index, column in renames.items():
+            print(f"Renaming sheet column {headers[index]!r} to {column!r}")
+            headers[index] = column
+        headers += [key for key in wanted if key not in headers]
+        if headers == self.headers:
+            return
+        ensure_columns(self.worksheet, len(headers))
+        range_name, values = header_update(self.headers, headers, renames)
+        self.rate_limiter.acquire()
+        self.worksheet.update(range_name=range_name, values=[values])
+        self.headers = headers
+
+    def _row_values(self, satellite_name, data):
+        # None leaves a cell untouched in a Sheets values update
+        values = [None] * len(self.headers)
+        for key, value in data.items():
+            values[self.headers.index(key)] = cell_value(value)
+        values[self.headers.index(self.key_column)] = satellite_name
+        return values
+
+    def _appended_row(self, response):
+        """Row number written by append_row, from the API response when available"""
+        updated = (response or {}).get("updates", {}).get("updatedRange", "")
+        match = re.search(r"[A-Z]+(\d+)(?::[A-Z]+\d+)?$", updated)
+        return int(match.group(1)) if match else self.last_row + 1
+
+    def upsert(self, satellite_name, data):
+        """Update the satellite's row, or append one; returns the row number"""
+        with self._lock:
+            self._ensure_loaded()
+            self._ensure_headers(list(data))
+            values = self._row_values(satellite_name, data)
+            row = self.rows.get(satellite_name)
+            self.rate_limiter.acquire()
+            if row is not None:
+                self.worksheet.update(range_name=f"A{row}:{column_letter(len(values))}{row}", values=[values])
+                return row
+            # Appending lets the API find the end of the table, even if another writer added rows
+            response = self.worksheet.append_row(
+                ["" if value is None else value for value in values], value_input_option="RAW"
+            )
+            row = self._appended_row(response)
+            self.rows[satellite_name] = row
+            self.last_row = max(self.last_row, row)
+            return row
+
+
+class SheetSync:
+    """Push every satellite in the store to a worksheet, sending only what changed
+
+    The sheet is read once with get_all_values and diffed against the
+    flattened store. Changed rows go out as ranges of a few batch_update calls
+    (unchanged cells inside a range are sent as null, which the API skips),
+    new satellites as one append_rows call, and new columns as one header
+    update. Write requests pass through a rate limiter sized for the Sheets
+    quota, so syncing thousands of satellites takes a handful of requests.
+    """
+
+    def __init__(self, worksheet, max_cells_per_request=SHEETS_MAX_CELLS_PER_REQUEST, rate_limiter=None):
+        self.worksheet = worksheet
+        self.max_cells_per_request = max_cells_per_request
+        self.rate_limiter = rate_limiter or sheets_rate_limiter
+
+    def plan(self, records):
+        """Diff (satellite_name, entries) records against the sheet
+
+        Returns (headers, renames, new_headers, updates, appends) where renames
+        maps legacy header indexes to their new names, updates is a list of
+        {"range", "values"} and appends a list of full rows.
+        """
+        values = self.worksheet.get_all_values()
+        headers = list(values[0]) if values else []
+        old_headers = list(headers)
+        existing = {}
+        if KEY_COLUMN in headers:
+            key_index = headers.index(KEY_COLUMN)
+            for row_number, row in enumerate(values[1:], start=2):
+                name = row[key_index] if key_index < len(row) else ""
+                if name and name not in existing:
+                    existing[name] = (row_number, row)
+
+        rows = [flatten_record(satellite_name, entries) for satellite_name, entries in records]
+        renames = legacy_renames(headers, {column for row in rows for column in row})
+        for index, column in renames.items():
+            headers[index] = column
+        known = set(headers)
+        new_headers = [
+            column for column in column_order({column for row in rows for column in row})
+            if column not in known
+        ]
+        headers = headers + new_headers
+        positions = {column: index for index, column in enumerate(headers)}
+
+        updates, appends = [], []
+        for row in rows:
+            found = existing.get(row[KEY_COLUMN])
+            if found is None:
+                appends.append([cell_value(row.get(column)) for column in headers])
+                continue
+            row_number, current = found
+            changed = [
+                positions[column] for column, value in row.items()
+                if cell_text(value) != (current[positions[column]] if positions[column] < len(current) else "")
+            ]
+            if not changed:
+                continue
+            first, last = min(changed), max(changed)
+            wanted = {positions[column]: value for column, value in row.items()}
+            updates.append({
+                "range": f"{column_letter(first + 1)}{row_number}:{column_letter(last + 1)}{row_number}",
+                "values": [[
+                    cell_value(wanted[index]) if index in changed else None
+                    for index in range(first, last + 1)
+                ]],
+            })
+        return headers, renames, new_headers, updates, appends
+
+    def _write(self, method, *args, **kwargs):
+        self.rate_limiter.acquire()
+        return method(*args, **kwargs)
+
+    def _chunks(self, updates):
+        chunk, cells = [], 0
+        for update in updates:
+            size = len(update["values"][0])
+            if chunk and cells + size > self.max_cells_per_request:
+                yield chunk
+                chunk, cells = [], 0
+            chunk.append(update)
+            cells += size
+        if chunk:
+            yield chunk
+
+    def sync(self, records, dry_run=False):
+        """Sync records and return a summary of what was (or, with dry_run, would be) written"""
+        headers, renames, new_headers, updates, appends = self.plan(records)
+        summary = {
+            "columns_renamed": len(renames),
+            "columns_added": len(new_headers),
+            "rows_updated": len(updates),
+            "rows_appended": len(appends),
+            "cells_written": sum(
+                sum(value is not None for value in update["values"][0]) for update in updates
+            ) + sum(len(row) for row in appends) + len(renames) + len(new_headers),
+            "write_requests": 0,
+        }
+        if dry_run:
+            return summary
+
+        if renames or new_headers:
+            ensure_columns(self.worksheet, len(headers))
+            range_name, values = header_update(headers[:len(headers) - len(new_headers)], headers, renames)
+            self._write(self.worksheet.update, range_name=range_name, values=[values])
+            summary["write_requests"] += 1
+        for chunk in self._chunks(updates):
+            self._write(self.worksheet.batch_update, chunk, value_input_option="RAW")
+            summary["write_requests"] += 1
+        rows_per_request = max(1, self.max_cells_per_request // max(1, len(headers)))
+        for start in range(0, len(appends), rows_per_request):
+            self._write(
+                self.worksheet.append_rows, appends[start:start + rows_per_request], value_input_option="RAW"
+            )
+            summary["write_requests"] += 1
+        return summary
+
+
+def sync_store(worksheet, data_manager, dry_run=False):
+    """Sync every satellite in a SatelliteDataManager to a worksheet"""
+    return SheetSync(worksheet).sync(data_manager.iter_satellites(), dry_run=dry_run)
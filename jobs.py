@@ -0,0 +1,251 @@
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import config
+import fast_path
+from bot_pool import get_bot_pool
+from bots import FailedLookup
+from data_manager import get_data_manager, name_key
+from log_stream import LogBuffer
+from sqlite_local import SqliteConnections
+
+DEFAULT_JOBS_FILE = "jobs.db"
+JOB_WORKERS = int(config.get("JOB_WORKERS", "2"))
+# A job still "running" this long after it started belongs to a server process that died
+JOB_STALE_SECONDS = float(config.get("JOB_STALE_SECONDS", "1800"))
+# Log lines kept with a finished job
+JOB_LOG_LINES = 200
+
+ACTIVE_STATUSES = ("queued", "running")
+
+# Log buffer of the job running in this context; research threads inherit it via copy_context
+_job_log = ContextVar("job_log", default=None)
+
+
+class _JobStdout:
+    """sys.stdout stand-in sending prints made while a job runs to that job's log"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, text):
+        log = _job_log.get()
+        return (log or self.stream).write(text)
+
+    def flush(self):
+        log = _job_log.get()
+        (log or self.stream).flush()
+
+    def isatty(self):
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+_stdout_lock = threading.Lock()
+
+
+def install_job_stdout():
+    """Route job output to per-job logs; other output still reaches the real stdout"""
+    with _stdout_lock:
+        if not isinstance(sys.stdout, _JobStdout):
+            sys.stdout = _JobStdout(sys.stdout)
+
+
+class JobStore:
+    """Gather jobs persisted in SQLite, so they survive reruns, disconnects and restarts"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            satellite_name TEXT NOT NULL,
+            name_key TEXT NOT NULL,
+            data_type TEXT NOT NULL,
+            fast INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL,
+            submitted_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL,
+            error TEXT,
+            log TEXT
+        );
+        -- Spellings of one satellite share a name_key, so they share jobs too
+        CREATE INDEX IF NOT EXISTS idx_jobs_lookup ON jobs (name_key, data_type, id);
+        CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status);
+    """
+
+    COLUMNS = ("id", "satellite_name", "data_type", "fast", "status", "submitted_at",
+               "started_at", "finished_at", "error", "log")
+
+    def __init__(self, path=DEFAULT_JOBS_FILE, max_age_seconds=7 * 24 * 3600):
+        self.path = path
+        self._db = SqliteConnections(path, self.SCHEMA)
+        conn = self._db.get()
+        # Finished jobs this old are of no interest to anyone
+        conn.execute(
+            "DELETE FROM jobs WHERE status NOT IN ('queued', 'running') AND submitted_at < ?",
+            (time.time() - max_age_seconds,)
+        )
+
+    def _rows(self, sql, params=()):
+        return [dict(zip(self.COLUMNS, row)) for row in self._db.get().execute(sql, params)]
+
+    def create(self, satellite_name, data_type, fast=False):
+        """Queue a job, or return the id of the queued or running job for the same lookup"""
+        conn = self._db.get()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE name_key = ? AND data_type = ? AND status IN ('queued', 'running')",
+                (name_key(satellite_name), data_type)
+            ).fetchone()
+            if row:
+                job_id, created = row[0], False
+            else:
+                cursor = conn.execute(
+                    "INSERT INTO jobs (satellite_name, name_key, data_type, fast, status, submitted_at) "
+                    "VALUES (?, ?, ?, ?, 'queued', ?)",
+                    (satellite_name, name_key(satellite_name), data_type, int(fast), time.time())
+                )
+                job_id, created = cursor.lastrowid, True
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return job_id, created
+
+    def claim(self, job_id):
+        """Move a queued job to running; False if another worker already took it"""
+        cursor = self._db.get().execute(
+            "UPDATE jobs SET status = 'running', started_at = ? WHERE id = ? AND status = 'queued'",
+            (time.time(), job_id)
+        )
+        return cursor.rowcount == 1
+
+    def finish(self, job_id, status, error=None, log=None):
+        self._db.get().execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, error = ?, log = ? WHERE id = ?",
+            (status, time.time(), error, log, job_id)
+        )
+
+    def requeue_stale(self, stale_seconds=JOB_STALE_SECONDS):
+        """Queue jobs again whose worker process died while running them"""
+        self._db.get().execute(
+            "UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running' AND started_at < ?",
+            (time.time() - stale_seconds,)
+        )
+
+    def get(self, job_id):
+        rows = self._rows(f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE id = ?", (job_id,))
+        return rows[0] if rows else None
+
+    def latest(self, satellite_name, data_type):
+        """The most recent job for a lookup, or None"""
+        rows = self._rows(
+            f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE name_key = ? AND data_type = ? "
+            "ORDER BY id DESC LIMIT 1",
+            (name_key(satellite_name), data_type)
+        )
+        return rows[0] if rows else None
+
+    def queued(self):
+        return self._rows(f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE status = 'queued' ORDER BY id")
+
+    def recent(self, limit=20):
+        return self._rows(f"SELECT {', '.join(self.COLUMNS)} FROM jobs ORDER BY id DESC LIMIT ?", (limit,))
+
+
+class JobRunner:
+    """Runs Gather jobs on a background thread pool, tracked in a JobStore
+
+    Jobs keep running when the browser session that submitted them goes
+    away, and their results land in the satellite store like an inline
+    lookup's. Submitting a lookup that is already queued or running returns
+    the existing job. Jobs queued (or orphaned) by an earlier server process
+    are picked up when the runner starts. Output printed while a job runs is
+    kept in that job's log instead of the server console.
+    """
+
+    def __init__(self, store=None, max_workers=JOB_WORKERS, data_manager=None):
+        self.store = store or JobStore(config.get("JOBS_DB_PATH", DEFAULT_JOBS_FILE))
+        self.data_manager = data_manager or get_data_manager()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._logs = {}
+        install_job_stdout()
+        self.resume()
+
+    def resume(self):
+        """Schedule every queued job, including ones orphaned by a dead process"""
+        self.store.requeue_stale()
+        for job in self.store.queued():
+            self.executor.submit(self._run, job["id"])
+
+    def submit(self, satellite_name, data_type, fast=False):
+        """Queue a lookup and return its job id"""
+        satellite_name = self.data_manager.resolve_name(satellite_name)
+        job_id, created = self.store.create(satellite_name, data_type, fast)
+        if created:
+            self.executor.submit(self._run, job_id)
+        return job_id
+
+    def latest(self, satellite_name, data_type):
+        return self.store.latest(self.data_manager.resolve_name(satellite_name), data_type)
+
+    def log(self, job, limit=JOB_LOG_LINES):
+        """Log tail of a job: live while this process runs it, stored once it finished"""
+        buffer = self._logs.get(job["id"])
+        if buffer is not None:
+            return buffer.text(limit)
+        return job.get("log") or ""
+
+    @contextmanager
+    def _capture(self, job_id):
+        buffer = self._logs[job_id] = LogBuffer()
+        token = _job_log.set(buffer)
+        try:
+            yield buffer
+        finally:
+            _job_log.reset(token)
+
+    def _run(self, job_id):
+        if not self.store.claim(job_id):
+            return
+        job = self.store.get(job_id)
+        satellite_name, data_type = job["satellite_name"], job["data_type"]
+        with self._capture(job_id) as buffer:
+            try:
+                print(f"Job {job_id}: gathering {data_type} for {satellite_name}")
+                bot = get_bot_pool().get(data_type)
+                if job["fast"]:
+                    result = fast_path.extract(bot, satellite_name)
+                else:
+                    result = bot.process_satellite(satellite_name)
+                if isinstance(result, FailedLookup):
+                    # Keep the placeholder out of the store so the next Gather tries again
+                    raise RuntimeError(result.reason)
+                self.data_manager.append_satellite_data(satellite_name, data_type, result)
+                print(f"Job {job_id}: finished")
+                self.store.finish(job_id, "done", log=buffer.text(JOB_LOG_LINES))
+            except Exception as e:
+                print(f"Job {job_id} failed: {str(e)}")
+                self.store.finish(job_id, "failed", error=str(e), log=buffer.text(JOB_LOG_LINES))
+            finally:
+                self._logs.pop(job_id, None)
+
+
+_job_runner = None
+_job_runner_lock = threading.Lock()
+
+
+def get_job_runner():
+    """Return the process-wide job runner, starting it (and resuming queued jobs) on first use"""
+    global _job_runner
+    with _job_runner_lock:
+        if _job_runner is None:
+            _job_runner = JobRunner()
+        return _job_runner
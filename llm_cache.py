@@ -0,0 +1,113 @@
+import hashlib
+import json
+import threading
+import time
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+import config
+from sqlite_local import SqliteConnections
+
+DEFAULT_CACHE_FILE = "llm_cache.db"
+
+
+class PersistentLLMCache(BaseCache):
+    """Exact-match LLM response cache stored in SQLite
+
+    LangChain calls lookup/update with the serialized message list as the
+    prompt and the model name plus call parameters as llm_string, so an entry
+    only matches when the model, its settings and every message are identical.
+    The least recently used entries are evicted beyond max_entries.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            key TEXT PRIMARY KEY,
+            generations TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            last_access REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache (last_access);
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_FILE, max_entries=5000):
+        self.path = path
+        self.max_entries = max_entries
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._db = SqliteConnections(path, self.SCHEMA)
+
+    def _count(self, name, amount=1):
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    @staticmethod
+    def _key(prompt, llm_string):
+        digest = hashlib.sha256()
+        digest.update(llm_string.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    def lookup(self, prompt, llm_string):
+        key = self._key(prompt, llm_string)
+        conn = self._db.get()
+        row = conn.execute("SELECT generations FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self._count("misses")
+            return None
+        conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+        self._count("hits")
+        return [loads(generation) for generation in json.loads(row[0])]
+
+    def update(self, prompt, llm_string, return_val):
+        generations = json.dumps([dumps(generation) for generation in return_val])
+        now = time.time()
+        conn = self._db.get()
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO llm_cache (key, generations, size, created_at, last_access)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (self._key(prompt, llm_string), generations, len(generations), now, now)
+        )
+        excess = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_access LIMIT ?)",
+                (excess,)
+            )
+            self._count("evictions", excess)
+
+    def clear(self, **kwargs):
+        self._db.get().execute("DELETE FROM llm_cache")
+
+    def stats(self):
+        """Return hit/miss counters for this process plus the current entry count and size"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        entries, size = self._db.get().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+        ).fetchone()
+        stats.update(entries=entries, size_bytes=size)
+        return stats
+
+
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """Return the process-wide LLM cache when LLM_CACHE_ENABLED=1, otherwise None"""
+    global _llm_cache
+    if config.get("LLM_CACHE_ENABLED", "0") != "1":
+        return None
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = PersistentLLMCache(
+                path=config.get("LLM_CACHE_PATH", DEFAULT_CACHE_FILE),
+                max_entries=int(config.get("LLM_CACHE_MAX_ENTRIES", "5000"))
+            )
+        return _llm_cache
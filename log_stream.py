@@ -0,0 +1,52 @@
+import re
+import threading
+from collections import deque
+
+import config
+
+# Lines kept per log
+LOG_MAX_LINES = int(config.get("LOG_STREAM_MAX_LINES", "5000"))
+LOG_MAX_LINE_CHARS = 2000
+
+# Colour codes from LangChain's verbose output show up as noise in a code block
+_ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+
+
+class LogBuffer:
+    """Thread-safe file-like sink keeping the last max_lines lines written to it"""
+
+    def __init__(self, max_lines=LOG_MAX_LINES):
+        self.lines = deque(maxlen=max_lines)
+        self.total_lines = 0
+        self._partial = ""
+        self._lock = threading.Lock()
+
+    def write(self, text):
+        if not text:
+            return 0
+        with self._lock:
+            chunks = (self._partial + _ANSI_ESCAPE.sub("", text)).split("\n")
+            self._partial = chunks.pop()
+            for line in chunks:
+                self.lines.append(line[:LOG_MAX_LINE_CHARS])
+            self.total_lines += len(chunks)
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+    def snapshot(self, limit=None):
+        """(last limit lines, total lines written), including an unfinished last line"""
+        with self._lock:
+            lines = list(self.lines)
+            if self._partial:
+                lines.append(self._partial[:LOG_MAX_LINE_CHARS])
+            total = self.total_lines + bool(self._partial)
+        return (lines[-limit:] if limit else lines), total
+
+    def text(self, limit=None):
+        return "\n".join(self.snapshot(limit)[0])
+
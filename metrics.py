@@ -0,0 +1,126 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+import config
+
+# name -> (Prometheus type, help text); every metric is labelled by bot and satellite
+METRICS = {
+    "runs": ("counter", "Satellite lookups started"),
+    "run_seconds": ("counter", "Wall time spent in satellite lookups"),
+    "llm_calls": ("counter", "LLM calls"),
+    "llm_errors": ("counter", "LLM calls that raised"),
+    "llm_seconds": ("counter", "Wall time spent waiting for the LLM"),
+    "prompt_tokens": ("counter", "Prompt tokens reported by the LLM"),
+    "completion_tokens": ("counter", "Completion tokens reported by the LLM"),
+    "llm_cost_usd": ("counter", "Estimated LLM cost in USD from the reported tokens"),
+    "search_calls": ("counter", "Web searches, including search cache hits"),
+    "search_errors": ("counter", "Web searches that raised"),
+    "search_seconds": ("counter", "Wall time spent waiting for web searches"),
+    "retries": ("counter", "Agent steps retried after a transient error"),
+    "fallbacks": ("counter", "Lookups answered with the all-NA fallback response"),
+    "coalesced": ("counter", "Lookups that joined an identical lookup already running"),
+}
+
+SEARCH_TOOL = "Tavily Search"
+
+# USD per million tokens; defaults are Gemini 1.5 Flash list prices
+INPUT_PRICE_PER_MILLION = float(config.get("LLM_INPUT_PRICE_PER_MILLION", "0.075"))
+OUTPUT_PRICE_PER_MILLION = float(config.get("LLM_OUTPUT_PRICE_PER_MILLION", "0.30"))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """Thread-safe counters keyed by metric, bot and satellite"""
+
+    def __init__(self, prefix="satellite_"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._values = {}
+        self.started_at = time.time()
+
+    def increment(self, name, bot, satellite, amount=1):
+        if name not in METRICS:
+            raise ValueError(f"Unknown metric: {name}")
+        key = (name, bot, satellite)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    @contextmanager
+    def timer(self, bot, satellite):
+        """Count one lookup and its wall time"""
+        self.increment("runs", bot, satellite)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.increment("run_seconds", bot, satellite, time.perf_counter() - started)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+            self.started_at = time.time()
+
+    def snapshot(self):
+        """Return {metric: [{"bot", "satellite", "value"}]}"""
+        with self._lock:
+            values = sorted(self._values.items())
+        result = {name: [] for name in METRICS}
+        for (name, bot, satellite), value in values:
+            result[name].append({"bot": bot, "satellite": satellite, "value": value})
+        return result
+
+    def totals(self, by="bot"):
+        """Return {metric: {bot or satellite: value}}, summed over the other label"""
+        totals = {name: {} for name in METRICS}
+        for name, samples in self.snapshot().items():
+            for sample in samples:
+                totals[name][sample[by]] = totals[name].get(sample[by], 0) + sample["value"]
+        return totals
+
+    def to_json(self):
+        return json.dumps(
+            {"started_at": self.started_at, "metrics": self.snapshot(), "by_bot": self.totals("bot")},
+            indent=2
+        )
+
+    def to_prometheus(self):
+        """Render the counters in the Prometheus text exposition format"""
+        lines = []
+        for name, samples in self.snapshot().items():
+            metric_type, help_text = METRICS[name]
+            metric = f"{self.prefix}{name}_total"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {metric_type}")
+            for sample in samples:
+                lines.append(
+                    f'{metric}{{bot="{_escape(sample["bot"])}",satellite="{_escape(sample["satellite"])}"}} '
+                    f'{round(sample["value"], 6)}'
+                )
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write the metrics to path, in Prometheus format for .prom/.txt files and JSON otherwise"""
+        text = self.to_prometheus() if path.endswith((".prom", ".txt")) else self.to_json()
+        with open(path, "w") as f:
+            f.write(text)
+
+
+_metrics = MetricsRegistry()
+
+
+def get_metrics():
+    """Return the process-wide metrics registry"""
+    return _metrics
+
+
+def export_metrics(path=None):
+    """Write the metrics to path or METRICS_EXPORT_PATH; does nothing when neither is set"""
+    path = path or config.get("METRICS_EXPORT_PATH")
+    if path:
+        get_metrics().write(path)
+    return path
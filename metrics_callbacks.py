@@ -0,0 +1,72 @@
+import time
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from metrics import INPUT_PRICE_PER_MILLION, OUTPUT_PRICE_PER_MILLION, SEARCH_TOOL, get_metrics
+
+# Kept apart from metrics.py so reading or exporting metrics doesn't import LangChain
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """LangChain callback handler recording LLM and search activity for one bot and satellite"""
+
+    def __init__(self, bot, satellite, registry=None):
+        self.bot = bot
+        self.satellite = satellite
+        self.registry = registry or get_metrics()
+        self._started = {}
+
+    def _start(self, run_id):
+        self._started[run_id] = time.perf_counter()
+
+    def _elapsed(self, run_id):
+        started = self._started.pop(run_id, None)
+        return time.perf_counter() - started if started is not None else 0.0
+
+    def _record(self, name, amount=1):
+        self.registry.increment(name, self.bot, self.satellite, amount)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._record("llm_calls")
+        self._record("llm_seconds", self._elapsed(run_id))
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    prompt_tokens = usage.get("input_tokens", 0)
+                    completion_tokens = usage.get("output_tokens", 0)
+                    self._record("prompt_tokens", prompt_tokens)
+                    self._record("completion_tokens", completion_tokens)
+                    self._record(
+                        "llm_cost_usd",
+                        (prompt_tokens * INPUT_PRICE_PER_MILLION + completion_tokens * OUTPUT_PRICE_PER_MILLION) / 1e6
+                    )
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._record("llm_calls")
+        self._record("llm_errors")
+        self._record("llm_seconds", self._elapsed(run_id))
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        if (serialized or {}).get("name") == SEARCH_TOOL:
+            self._start(run_id)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        if run_id in self._started:
+            self._record("search_calls")
+            self._record("search_seconds", self._elapsed(run_id))
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        if run_id in self._started:
+            self._record("search_calls")
+            self._record("search_errors")
+            self._record("search_seconds", self._elapsed(run_id))
+
+    def on_retry(self, retry_state, *, run_id, **kwargs):
+        self._record("retries")
@@ -0,0 +1,320 @@
+import heapq
+import re
+import threading
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from itertools import islice
+
+from bots import DATA_TYPES
+from data_manager import name_key
+from refresh import DEFAULT_TTL_DAYS
+
+# Checked in order, so "geostationary transfer orbit" is GEO and "sun-synchronous" is LEO
+ORBIT_PATTERNS = [
+    ("GEO", re.compile(r"\b(geo|gso|gto|geostationary|geosynchronous)\b", re.I)),
+    ("HEO", re.compile(r"\b(heo|highly elliptical|molniya|tundra)\b", re.I)),
+    ("MEO", re.compile(r"\b(meo|medium earth)\b", re.I)),
+    ("LEO", re.compile(r"\b(leo|low earth|sso|sun[- ]synchronous|polar)\b", re.I)),
+]
+ORBIT_CLASSES = [orbit for orbit, _ in ORBIT_PATTERNS] + ["Other", "Unknown"]
+
+# fresh: every category stored and younger than the refresh TTL; stale: some category
+# older than it; incomplete: some category never gathered
+FRESHNESS = ["fresh", "stale", "incomplete"]
+
+
+def orbit_class(text):
+    """Coarse orbit class of a launch_orbit_classification value"""
+    if not text or str(text).strip().lower() in ("na", "n/a", "unknown"):
+        return "Unknown"
+    for orbit, pattern in ORBIT_PATTERNS:
+        if pattern.search(str(text)):
+            return orbit
+    return "Other"
+
+
+def trigrams(text):
+    return {text[index:index + 3] for index in range(len(text) - 2)}
+
+
+def freshness_class(updated, cutoff):
+    """FRESHNESS value of a satellite, from {data_type: last_updated} of its stored entries"""
+    if any(data_type not in updated for data_type in DATA_TYPES):
+        return "incomplete"
+    if any((stamp or "") < cutoff for stamp in updated.values()):
+        return "stale"
+    return "fresh"
+
+
+def freshness_cutoff(now=None, ttl_days=DEFAULT_TTL_DAYS):
+    return ((now or datetime.now()) - timedelta(days=ttl_days)).isoformat()
+
+
+def oldest_stamp(updated):
+    """Oldest last_updated of a satellite with every category stored, else None
+
+    Such a satellite turns stale once the refresh cutoff passes this stamp.
+    """
+    if any(data_type not in updated for data_type in DATA_TYPES):
+        return None
+    return min((stamp or "") for stamp in updated.values())
+
+
+def _insert_sorted(items, new):
+    # Sorting a sorted list with a few items appended is close to linear
+    if new:
+        items.extend(new)
+        items.sort()
+
+
+def _remove_sorted(items, old):
+    if len(old) > 64:
+        old = set(old)
+        items[:] = [item for item in items if item not in old]
+    else:
+        for item in old:
+            del items[bisect_left(items, item)]
+
+
+class SatelliteNameIndex:
+    """Search and filter satellite names without touching the store
+
+    Names are kept sorted (lowercased) for prefix search by bisection, and
+    every name is listed under each of its trigrams, so a substring query of
+    three or more characters only checks names sharing all of the query's
+    trigrams; shorter queries scan the names. Each (orbit, freshness) group
+    is kept sorted too, so filtering without a search text only reads the
+    names on the requested page. update() and remove() change satellites in
+    place, at a cost that follows the number of satellites changed rather
+    than the index size, and age() marks satellites stale as the refresh
+    cutoff passes them.
+    """
+
+    def __init__(self, cutoff=None):
+        self.cutoff = cutoff or freshness_cutoff()
+        self.orbits = {}
+        self.freshness = {}
+        # satellite_name -> {data_type: last_updated}
+        self.updated = {}
+        # (lowercased name, name), sorted
+        self._entries = []
+        # trigram -> names containing it
+        self._trigrams = {}
+        # (orbit, freshness) -> sorted (lowercased name, name)
+        self._groups = {}
+        # (oldest_stamp, name) of every satellite that can still turn stale, sorted
+        self._oldest = []
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _group(self, names):
+        groups, oldest = {}, []
+        for name in names:
+            fresh = self.freshness[name] = freshness_class(self.updated[name], self.cutoff)
+            groups.setdefault((self.orbits[name], fresh), []).append((name.lower(), name))
+            stamp = oldest_stamp(self.updated[name])
+            if stamp is not None:
+                oldest.append((stamp, name))
+        for group, items in groups.items():
+            _insert_sorted(self._groups.setdefault(group, []), items)
+        _insert_sorted(self._oldest, oldest)
+
+    def _ungroup(self, names):
+        groups, oldest = {}, []
+        for name in names:
+            groups.setdefault((self.orbits[name], self.freshness.pop(name)), []).append((name.lower(), name))
+            stamp = oldest_stamp(self.updated[name])
+            if stamp is not None:
+                oldest.append((stamp, name))
+        for group, items in groups.items():
+            _remove_sorted(self._groups[group], items)
+        _remove_sorted(self._oldest, oldest)
+
+    def update(self, satellites):
+        """Add or replace satellites, given as {satellite_name: (orbit class, {data_type: last_updated})}"""
+        with self._lock:
+            self._ungroup([name for name in satellites if name in self.orbits])
+            added = [name for name in satellites if name not in self.orbits]
+            for name, (orbit, updated) in satellites.items():
+                self.orbits[name] = orbit
+                self.updated[name] = dict(updated)
+            _insert_sorted(self._entries, [(name.lower(), name) for name in added])
+            for name in added:
+                for gram in trigrams(name.lower()):
+                    self._trigrams.setdefault(gram, set()).add(name)
+            self._group(satellites)
+
+    def remove(self, names):
+        """Drop satellites; names not in the index are ignored"""
+        with self._lock:
+            names = [name for name in dict.fromkeys(names) if name in self.orbits]
+            self._ungroup(names)
+            _remove_sorted(self._entries, [(name.lower(), name) for name in names])
+            for name in names:
+                for gram in trigrams(name.lower()):
+                    posting = self._trigrams[gram]
+                    posting.discard(name)
+                    if not posting:
+                        del self._trigrams[gram]
+                del self.orbits[name], self.updated[name]
+
+    def age(self, cutoff):
+        """Move the refresh cutoff forward, re-classing only the satellites it passed"""
+        with self._lock:
+            if cutoff <= self.cutoff:
+                return
+            # Satellites older than the previous cutoff are already stale
+            start = bisect_left(self._oldest, (self.cutoff,))
+            names = [name for _, name in self._oldest[start:bisect_left(self._oldest, (cutoff,))]]
+            self._ungroup(names)
+            self.cutoff = cutoff
+            self._group(names)
+
+    def _matches(self, text):
+        """Names containing text: prefix matches first, then other substring matches"""
+        start = bisect_left(self._entries, (text,))
+        end = bisect_left(self._entries, (text + "\uffff",), start)
+        prefix = [name for _, name in self._entries[start:end]]
+        if len(text) < 3:
+            # No trigrams to narrow the search down: check every name
+            return prefix + [name for key, name in self._entries if text in key and not key.startswith(text)]
+        # Intersect the smallest posting sets first to keep the candidate set small
+        postings = sorted((self._trigrams.get(gram, set()) for gram in trigrams(text)), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                break
+        others = sorted(
+            (key, name) for key, name in ((name.lower(), name) for name in candidates)
+            if text in key and not key.startswith(text)
+        )
+        return prefix + [name for _, name in others]
+
+    def search(self, text="", orbits=None, freshness=None, page=0, page_size=25):
+        """One page of matching names, with the total number of matches
+
+        text matches anywhere in the name, case-insensitively, and names
+        starting with it come first; orbits and freshness are collections of
+        ORBIT_CLASSES / FRESHNESS values and None means no filter.
+        """
+        text = (text or "").strip().lower()
+        start = max(0, page) * page_size
+        with self._lock:
+            if not text:
+                if not orbits and not freshness:
+                    return [name for _, name in self._entries[start:start + page_size]], len(self._entries)
+                # Merge the already sorted groups lazily, reading only up to the end of the page
+                groups = [
+                    items for (orbit, fresh), items in self._groups.items()
+                    if (not orbits or orbit in orbits) and (not freshness or fresh in freshness)
+                ]
+                page_items = islice(heapq.merge(*groups), start, start + page_size)
+                return [name for _, name in page_items], sum(map(len, groups))
+            names = [
+                name for name in self._matches(text)
+                if (not orbits or self.orbits[name] in orbits)
+                and (not freshness or self.freshness[name] in freshness)
+            ]
+        return names[start:start + page_size], len(names)
+
+
+_index = None
+# (id of the data manager, store version) the index is current for
+_index_key = None
+# Newest last_updated in the index; the next update reads entries written after it
+_watermark = ""
+# A write takes its timestamp before waiting (up to SQLite's 30 s busy timeout) for
+# the write lock, so it can commit behind a newer one already indexed; updates
+# re-read this far before the watermark to pick such writes up
+CLOCK_SLACK_SECONDS = 60
+_index_lock = threading.Lock()
+
+
+def _orbit(entry):
+    return orbit_class(((entry or {}).get("data") or {}).get("launch_orbit_classification"))
+
+
+def _newest(updated, watermark=""):
+    return max([watermark] + [stamp for stamps in updated for stamp in stamps.values() if stamp])
+
+
+def _since(watermark):
+    try:
+        return (datetime.fromisoformat(watermark) - timedelta(seconds=CLOCK_SLACK_SECONDS)).isoformat()
+    except ValueError:
+        return watermark
+
+
+def _build(data_manager):
+    """Index the whole store in one pass; returns (index, watermark)"""
+    satellites = {
+        satellite_name: (
+            _orbit(entries.get("basic_info")),
+            {data_type: (entry or {}).get("last_updated") for data_type, entry in entries.items()},
+        )
+        for satellite_name, entries in data_manager.iter_satellites()
+    }
+    index = SatelliteNameIndex()
+    index.update(satellites)
+    return index, _newest(updated for _, updated in satellites.values())
+
+
+def _apply_changes(index, data_manager, rows, deleted):
+    """Apply changes_since() output to the index; returns the new watermark"""
+    deleted = set(deleted)
+    changed = {}
+    for satellite_name, data_type, last_updated in rows:
+        changed.setdefault(satellite_name, {})[data_type] = last_updated
+    satellites = {}
+    for satellite_name, stamps in changed.items():
+        # A satellite deleted and stored again starts over
+        known = satellite_name not in deleted
+        updated = dict(index.updated.get(satellite_name) or {}) if known else {}
+        orbit = index.orbits.get(satellite_name) if known else None
+        if orbit is None or ("basic_info" in stamps and stamps["basic_info"] != updated.get("basic_info")):
+            orbit = _orbit(data_manager.store.get_entry(satellite_name, "basic_info"))
+        updated.update(stamps)
+        if updated != index.updated.get(satellite_name) or orbit != index.orbits.get(satellite_name):
+            satellites[satellite_name] = (orbit, updated)
+    # merge_duplicates deletes spellings after copying their (older) entries into the
+    # first one, so re-read whichever satellite now holds a deleted name's key
+    for satellite_name in deleted:
+        survivor = data_manager.store.find_name(name_key(satellite_name))
+        entries = data_manager.store.get(survivor) if survivor else None
+        if entries:
+            satellites[survivor] = (
+                _orbit(entries.get("basic_info")),
+                {data_type: (entry or {}).get("last_updated") for data_type, entry in entries.items()},
+            )
+    index.remove([satellite_name for satellite_name in deleted if satellite_name not in satellites])
+    index.update(satellites)
+    return _newest(changed.values(), _watermark)
+
+
+def get_name_index(data_manager):
+    """Index of the store's satellites, kept current as the store changes
+
+    The first call reads the whole store. After a write (each finished job,
+    for instance) changes the store version, only the entries written since
+    the last update are read, through the store's last_updated index, along
+    with the satellites deleted since, so keeping the index current costs in
+    proportion to the writes rather than the store size. The JSON backend
+    keeps no change log and is re-read in full instead.
+    """
+    global _index, _index_key, _watermark
+    with _index_lock:
+        version = data_manager.version()
+        if _index is None or _index_key[0] != id(data_manager):
+            _index, _watermark = _build(data_manager)
+        elif _index_key[1] != version:
+            changes = data_manager.changes_since(_index_key[1], _since(_watermark))
+            if changes is None:
+                _index, _watermark = _build(data_manager)
+            else:
+                _watermark = _apply_changes(_index, data_manager, *changes)
+        _index_key = (id(data_manager), version)
+        _index.age(freshness_cutoff())
+        return _index
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+
+import aiohttp
+import requests
+from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_community.tools.tavily_search import TavilySearchResults
+from langchain_community.utilities.tavily_search import TAVILY_API_URL, TavilySearchAPIWrapper
+from requests.adapters import HTTPAdapter
+
+import config
+from clients import gemini_limiter, gemini_rate_limiter
+from rate_limiter import estimate_tokens
+from tracing import span
+
+
+def _prompt_tokens(messages):
+    return estimate_tokens("".join(str(message.content) for message in messages))
+
+
+def _used_tokens(result):
+    """Total tokens reported by Gemini for a ChatResult, or None if not reported"""
+    for generation in result.generations:
+        usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+        if usage:
+            return usage.get("total_tokens")
+    return None
+
+
+class ThrottledChatGoogleGenerativeAI(ChatGoogleGenerativeAI):
+    """Gemini chat model whose API calls go through the shared rate and concurrency limits"""
+
+    def _generate(self, messages, *args, **kwargs):
+        estimated = _prompt_tokens(messages)
+        # Wait for quota before taking a concurrency slot so waiting callers don't hold one
+        with span("gemini_rate_limit_wait", "wait", estimated_tokens=estimated):
+            gemini_rate_limiter.acquire(tokens=estimated)
+        with gemini_limiter.slot(), span("gemini_call", "llm", model=self.model) as details:
+            result = super()._generate(messages, *args, **kwargs)
+            used = details["tokens"] = _used_tokens(result)
+        if used is not None:
+            gemini_rate_limiter.record_usage(used, estimated)
+        return result
+
+    async def _agenerate(self, messages, *args, **kwargs):
+        estimated = _prompt_tokens(messages)
+        with span("gemini_rate_limit_wait", "wait", estimated_tokens=estimated):
+            await gemini_rate_limiter.aacquire(tokens=estimated)
+        async with gemini_limiter.aslot():
+            with span("gemini_call", "llm", model=self.model) as details:
+                result = await super()._agenerate(messages, *args, **kwargs)
+                used = details["tokens"] = _used_tokens(result)
+        if used is not None:
+            gemini_rate_limiter.record_usage(used, estimated)
+        return result
+
+
+# One keep-alive session for all Tavily requests instead of a new connection per search
+_http_session = requests.Session()
+_http_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=32))
+
+# aiohttp sessions are tied to the event loop they were created on, so async searches
+# share one keep-alive session per loop
+_async_sessions = {}
+_async_sessions_lock = threading.Lock()
+
+
+def _async_http_session():
+    """Return the running event loop's shared aiohttp session"""
+    loop = asyncio.get_running_loop()
+    with _async_sessions_lock:
+        # Sessions of loops that have been closed can never be used again
+        for closed in [other for other in _async_sessions if other.is_closed()]:
+            del _async_sessions[closed]
+        session = _async_sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=30),
+                timeout=aiohttp.ClientTimeout(total=60)
+            )
+            _async_sessions[loop] = session
+        return session
+
+
+class PooledTavilySearchAPIWrapper(TavilySearchAPIWrapper):
+    """Tavily API wrapper that sends requests over the shared keep-alive sessions"""
+
+    def _params(self, query, max_results, search_depth, include_domains, exclude_domains,
+                include_answer, include_raw_content, include_images, **kwargs):
+        return {
+            "api_key": self.tavily_api_key.get_secret_value(),
+            "query": query,
+            "max_results": max_results,
+            "search_depth": search_depth,
+            "include_domains": include_domains or [],
+            "exclude_domains": exclude_domains or [],
+            "include_answer": include_answer,
+            "include_raw_content": include_raw_content,
+            "include_images": include_images,
+            **kwargs,
+        }
+
+    def raw_results(self, query, max_results=5, search_depth="advanced", include_domains=None,
+                    exclude_domains=None, include_answer=False, include_raw_content=False,
+                    include_images=False, **kwargs):
+        params = self._params(query, max_results, search_depth, include_domains, exclude_domains,
+                              include_answer, include_raw_content, include_images, **kwargs)
+        response = _http_session.post(f"{TAVILY_API_URL}/search", json=params, timeout=60)
+        response.raise_for_status()
+        return response.json()
+
+    async def raw_results_async(self, query, max_results=5, search_depth="advanced", include_domains=None,
+                                exclude_domains=None, include_answer=False, include_raw_content=False,
+                                include_images=False, **kwargs):
+        params = self._params(query, max_results, search_depth, include_domains, exclude_domains,
+                              include_answer, include_raw_content, include_images, **kwargs)
+        async with _async_http_session().post(f"{TAVILY_API_URL}/search", json=params) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+
+def create_search_tool(max_results=10):
+    """Tavily search tool sending its requests over the shared keep-alive sessions"""
+    config.load()  # the Tavily wrapper reads TAVILY_API_KEY from the environment
+    return TavilySearchResults(max_results=max_results, api_wrapper=PooledTavilySearchAPIWrapper())
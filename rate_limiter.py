@@ -0,0 +1,140 @@
+import asyncio
+import threading
+import time
+
+
+class RateLimiter:
+    """Token-bucket limiter on requests per minute and tokens per minute
+
+    Callers are served strictly in arrival order (each takes a ticket), so a
+    burst from one batch job cannot starve an interactive request that queued
+    earlier. Token usage is reserved from an estimate up front and corrected
+    with record_usage() once the real count is known. A limit of None or 0
+    disables that bucket.
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None):
+        self._condition = threading.Condition()
+        self._next_ticket = 0
+        self._serving = 0
+        self._abandoned = set()
+        self.configure(requests_per_minute, tokens_per_minute)
+
+    def configure(self, requests_per_minute=None, tokens_per_minute=None):
+        """Change the limits; buckets start full"""
+        with self._condition:
+            self.requests_per_minute = requests_per_minute or None
+            self.tokens_per_minute = tokens_per_minute or None
+            self._requests = float(self.requests_per_minute or 0)
+            self._tokens = float(self.tokens_per_minute or 0)
+            self._updated = time.monotonic()
+            self._condition.notify_all()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+
+    def _wait_time(self, tokens):
+        """Seconds until both buckets can cover one request of the given token count"""
+        wait = 0.0
+        if self.requests_per_minute and self._requests < 1:
+            wait = max(wait, (1 - self._requests) * 60 / self.requests_per_minute)
+        if self.tokens_per_minute:
+            # A single request larger than the whole bucket only waits for a full bucket
+            tokens = min(tokens, self.tokens_per_minute)
+            if self._tokens < tokens:
+                wait = max(wait, (tokens - self._tokens) * 60 / self.tokens_per_minute)
+        return wait
+
+    def _consume(self, tokens):
+        if self.requests_per_minute:
+            self._requests -= 1
+        if self.tokens_per_minute:
+            self._tokens -= min(tokens, self.tokens_per_minute)
+
+    def _advance(self):
+        self._serving += 1
+        while self._serving in self._abandoned:
+            self._abandoned.discard(self._serving)
+            self._serving += 1
+        self._condition.notify_all()
+
+    def _abandon(self, ticket):
+        if ticket == self._serving:
+            self._advance()
+        else:
+            self._abandoned.add(ticket)
+
+    def _try_serve(self, ticket, tokens):
+        """Grant the ticket if it is at the head of the queue and the buckets allow it
+
+        Returns 0 when granted, otherwise how long to wait before checking again.
+        """
+        if ticket != self._serving:
+            return None
+        self._refill()
+        wait = self._wait_time(tokens)
+        if wait <= 0:
+            self._consume(tokens)
+            self._advance()
+            return 0
+        return wait
+
+    def acquire(self, tokens=0, blocking=True):
+        """Wait for a request slot covering the estimated token count"""
+        with self._condition:
+            if not blocking:
+                if self._next_ticket != self._serving:
+                    return False
+                self._refill()
+                if self._wait_time(tokens) > 0:
+                    return False
+                self._consume(tokens)
+                return True
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            try:
+                while True:
+                    wait = self._try_serve(ticket, tokens)
+                    if wait == 0:
+                        return True
+                    self._condition.wait(wait)
+            except BaseException:
+                self._abandon(ticket)
+                raise
+
+    async def aacquire(self, tokens=0):
+        """Async version of acquire that sleeps on the event loop instead of blocking it"""
+        with self._condition:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+        try:
+            while True:
+                with self._condition:
+                    wait = self._try_serve(ticket, tokens)
+                if wait == 0:
+                    return True
+                await asyncio.sleep(min(wait, 0.5) if wait else 0.05)
+        except BaseException:
+            with self._condition:
+                self._abandon(ticket)
+            raise
+
+    def record_usage(self, actual_tokens, estimated_tokens=0):
+        """Correct the token bucket once a call reports its real token usage"""
+        if not self.tokens_per_minute:
+            return
+        with self._condition:
+            self._refill()
+            self._tokens -= actual_tokens - min(estimated_tokens, self.tokens_per_minute)
+            self._condition.notify_all()
+
+
+def estimate_tokens(text):
+    """Rough token estimate (about four characters per token)"""
+    return len(text) // 4 + 1
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+
+import config
+from bot_pool import get_bot_pool
+from bots import FailedLookup
+from data_manager import get_data_manager
+
+# Values the bots use for "not found"; a field holding one of these is always refreshed
+MISSING_VALUES = {"", "na", "n/a", "none", "null", "unknown", "not available", "partial"}
+
+DEFAULT_TTL_DAYS = float(config.get("REFRESH_DEFAULT_TTL_DAYS", "180"))
+
+# Fields that go out of date faster than the default
+FIELD_TTL_DAYS = {
+    "altitude": 30,
+    "orbital_life_years": 90,
+    "launch_success": 30,
+    "launch_date": 30,
+}
+
+
+def is_missing(value):
+    """Whether a bot output value means the information was not found"""
+    if value is None:
+        return True
+    if isinstance(value, dict):
+        return not value or all(is_missing(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return not value or all(is_missing(item) for item in value)
+    text = str(value).strip().lower()
+    return text in MISSING_VALUES or text.startswith("n/a ") or text.startswith("not available")
+
+
+def field_schemas(response_schema, field_groups, groups):
+    """ResponseSchema entries for the fields belonging to the requested groups"""
+    wanted = {field for group in groups for field in field_groups[group]}
+    return [schema for schema in response_schema if schema.name in wanted]
+
+
+def describe_fields(schemas):
+    """Numbered 'required information' list for a prompt"""
+    return "\n".join(f"{index}. {schema.description}" for index, schema in enumerate(schemas, 1))
+
+
+def stale_field_groups(entry, field_groups, now=None, ttl_days=None):
+    """Groups whose main field is missing, "NA"-like or older than its TTL"""
+    now = now or datetime.now()
+    ttl_days = ttl_days or {}
+    data = entry.get("data") or {}
+    field_updated = entry.get("field_updated") or {}
+    stale = []
+    for group, fields in field_groups.items():
+        if is_missing(data.get(group)):
+            stale.append(group)
+            continue
+        # Entries written before per-field timestamps fall back to the entry timestamp
+        updated = field_updated.get(group) or entry.get("last_updated")
+        ttl = ttl_days.get(group, FIELD_TTL_DAYS.get(group, DEFAULT_TTL_DAYS))
+        if not updated or datetime.fromisoformat(updated) + timedelta(days=ttl) <= now:
+            stale.append(group)
+    return stale
+
+
+def refresh_satellite(satellite_name, data_type, bot=None, data_manager=None, ttl_days=None, process=None):
+    """Ask the bot only for missing or expired fields and merge them into the store
+
+    process(satellite_name, fields=None) runs the lookup and defaults to
+    bot.process_satellite. Returns the merged data, None when nothing
+    needed refreshing, or the bot's FailedLookup (with nothing stored) when
+    the lookup failed.
+    """
+    bot = bot or get_bot_pool().get(data_type)
+    process = process or bot.process_satellite
+    data_manager = data_manager or get_data_manager()
+    entry = data_manager.get_satellite_data(satellite_name, data_type)
+    if entry is None:
+        result = process(satellite_name)
+        if not isinstance(result, FailedLookup):
+            data_manager.append_satellite_data(satellite_name, data_type, result)
+        return result
+
+    groups = stale_field_groups(entry, bot.FIELD_GROUPS, ttl_days=ttl_days)
+    if not groups:
+        print(f"{data_type} for {satellite_name} is up to date")
+        return None
+
+    print(f"Refreshing {data_type} fields for {satellite_name}: {', '.join(groups)}")
+    result = process(satellite_name, fields=groups)
+    if isinstance(result, FailedLookup):
+        return result
+    # Keep the stored value when the refresh still comes back empty
+    found = {
+        field: result[field]
+        for group in groups
+        if not is_missing(result.get(group))
+        for field in bot.FIELD_GROUPS[group]
+        if field in result
+    }
+    if not found:
+        return entry["data"]
+    data_manager.append_satellite_data(satellite_name, data_type, found, fields=list(found))
+    return data_manager.get_satellite_data(satellite_name, data_type)["data"]
@@ -0,0 +1,215 @@
+import asyncio
+import contextvars
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from clients import get_search_client
+from metrics import get_metrics
+from singleflight import SingleFlight
+from tracing import span
+
+# Per-category search queries; the bots build their own queries from these too
+SEARCH_QUERIES = {
+    "basic_info": '"{satellite_name}" satellite orbital altitude orbit classification payload launch specifications',
+    "technical_specs": '"{satellite_name}" satellite type application sensor specifications technological breakthroughs',
+    "launch_cost_info": '"{satellite_name}" satellite launch cost vehicle date site mass success reusability mission cost',
+}
+
+
+def research_queries(satellite_name):
+    """Queries run once per satellite to build the shared research corpus"""
+    return [f'"{satellite_name}" satellite'] + [
+        template.format(satellite_name=satellite_name) for template in SEARCH_QUERIES.values()
+    ]
+
+
+def _normalize_url(url):
+    return url.split("#", 1)[0].rstrip("/").lower()
+
+
+class ResearchCorpus:
+    """Deduplicated search results gathered once for a satellite and shared by all bots"""
+
+    def __init__(self, satellite_name, documents=None):
+        self.satellite_name = satellite_name
+        self.documents = []
+        # Queries whose results were added, so callers can skip re-running them
+        self.queries = set()
+        self._seen = set()
+        self.created_at = time.time()
+        for document in documents or []:
+            self.add(document)
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add(self, document):
+        """Add a search result unless its URL or content was already collected"""
+        url = document.get("url") or ""
+        content = (document.get("content") or "").strip()
+        if not content:
+            return False
+        keys = {"content:" + hashlib.sha1(content.encode("utf-8")).hexdigest()}
+        if url:
+            keys.add("url:" + _normalize_url(url))
+        if keys & self._seen:
+            return False
+        self._seen |= keys
+        self.documents.append({"url": url, "content": content, "query": document.get("query")})
+        return True
+
+    def add_results(self, query, results):
+        """Add the result list returned by one search query"""
+        if not isinstance(results, list):
+            return
+        self.queries.add(query)
+        for result in results:
+            if isinstance(result, dict):
+                self.add(dict(result, query=query))
+
+    def to_prompt(self, max_chars=16000, max_chars_per_document=1500):
+        """Render the corpus as numbered sources for an LLM prompt"""
+        parts, used = [], 0
+        for index, document in enumerate(self.documents, 1):
+            part = f"[{index}] {document['url'] or 'unknown source'}\n{document['content'][:max_chars_per_document]}"
+            if used + len(part) > max_chars:
+                break
+            parts.append(part)
+            used += len(part)
+        return "\n\n".join(parts)
+
+
+def gather_corpus(satellite_name, queries=None, search_client=None, max_workers=4):
+    """Run the research queries concurrently and return a deduplicated corpus"""
+    queries = queries or research_queries(satellite_name)
+    search_client = search_client or get_search_client()
+    corpus = ResearchCorpus(satellite_name)
+
+    def search(query):
+        get_metrics().increment("search_calls", "research", satellite_name)
+        try:
+            return search_client.run(query)
+        except Exception as e:
+            get_metrics().increment("search_errors", "research", satellite_name)
+            print(f"Research query failed ({query}): {str(e)}")
+            return None
+
+    # Each worker runs in a copy of the caller's context so its searches join the caller's trace
+    contexts = [contextvars.copy_context() for _ in queries]
+    with span("gather_corpus", "search", queries=len(queries)):
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            found = list(executor.map(lambda context, query: context.run(search, query), contexts, queries))
+    # map() keeps query order, so the corpus order is deterministic
+    for query, results in zip(queries, found):
+        corpus.add_results(query, results)
+    print(f"Gathered {len(corpus)} research documents for {satellite_name}")
+    return corpus
+
+
+async def agather_corpus(satellite_name, queries=None, search_client=None):
+    """Async version of gather_corpus"""
+    queries = queries or research_queries(satellite_name)
+    search_client = search_client or get_search_client()
+    corpus = ResearchCorpus(satellite_name)
+    with span("gather_corpus", "search", queries=len(queries)):
+        results = await asyncio.gather(
+            *(search_client.arun(query) for query in queries), return_exceptions=True
+        )
+    get_metrics().increment("search_calls", "research", satellite_name, len(queries))
+    for query, result in zip(queries, results):
+        if isinstance(result, Exception):
+            get_metrics().increment("search_errors", "research", satellite_name)
+            print(f"Research query failed ({query}): {str(result)}")
+            continue
+        corpus.add_results(query, result)
+    print(f"Gathered {len(corpus)} research documents for {satellite_name}")
+    return corpus
+
+
+class CorpusStore:
+    """Small in-process LRU of recent corpora so the three bots share one research pass
+
+    Only one caller gathers a given satellite at a time, whether it runs on
+    a thread or an event loop; the others wait for it and reuse its corpus.
+    """
+
+    def __init__(self, max_entries=64, ttl_seconds=3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._corpora = OrderedDict()
+        self._lock = threading.Lock()
+        self._gathers = SingleFlight()
+
+    def _fresh(self, satellite_name):
+        with self._lock:
+            corpus = self._corpora.get(satellite_name)
+            if corpus is None:
+                return None
+            if time.time() - corpus.created_at > self.ttl_seconds:
+                del self._corpora[satellite_name]
+                return None
+            self._corpora.move_to_end(satellite_name)
+            return corpus
+
+    def _remember(self, corpus):
+        with self._lock:
+            self._corpora[corpus.satellite_name] = corpus
+            self._corpora.move_to_end(corpus.satellite_name)
+            while len(self._corpora) > self.max_entries:
+                self._corpora.popitem(last=False)
+
+    def get(self, satellite_name):
+        """Return the shared corpus for a satellite, gathering it on first use"""
+        corpus = self._fresh(satellite_name)
+        if corpus is not None:
+            return corpus
+
+        def gather():
+            # A gather that finished just before this one joined is reused too
+            corpus = self._fresh(satellite_name)
+            if corpus is None:
+                corpus = gather_corpus(satellite_name)
+                self._remember(corpus)
+            return corpus
+
+        return self._gathers.do(satellite_name, gather)
+
+    async def aget(self, satellite_name):
+        """Async version of get"""
+        corpus = self._fresh(satellite_name)
+        if corpus is not None:
+            return corpus
+
+        async def gather():
+            corpus = self._fresh(satellite_name)
+            if corpus is None:
+                corpus = await agather_corpus(satellite_name)
+                self._remember(corpus)
+            return corpus
+
+        return await self._gathers.ado(satellite_name, gather)
+
+
+_corpus_store = CorpusStore()
+
+
+def prefetch_enabled():
+    return config.get("RESEARCH_PREFETCH", "1") != "0"
+
+
+def get_corpus(satellite_name):
+    """Return the shared research corpus for a satellite, or None when prefetch is disabled"""
+    if not prefetch_enabled():
+        return None
+    return _corpus_store.get(satellite_name)
+
+
+async def aget_corpus(satellite_name):
+    """Async version of get_corpus"""
+    if not prefetch_enabled():
+        return None
+    return await _corpus_store.aget(satellite_name)
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import threading
+import time
+
+import config
+from sqlite_local import SqliteConnections
+
+DEFAULT_CACHE_FILE = "search_cache.db"
+
+
+def normalize_query(query):
+    """Normalize a search query so trivially different spellings share a cache entry"""
+    return " ".join(str(query).casefold().split())
+
+
+class SearchCache:
+    """Persistent search result cache with per-entry TTL and a size-bounded LRU
+
+    Entries live in a local SQLite file so they survive restarts and are shared
+    by every process on the machine. Hit/miss counters are per process.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS search_cache (
+            key TEXT PRIMARY KEY,
+            query TEXT NOT NULL,
+            result TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            last_access REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_search_cache_access ON search_cache (last_access);
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_FILE, ttl_seconds=7 * 24 * 3600, max_entries=10000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+        self._db = SqliteConnections(path, self.SCHEMA)
+
+    def _count(self, name, amount=1):
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    @staticmethod
+    def _key(query):
+        return hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()
+
+    def get(self, query):
+        """Return the cached result for a query, or None on a miss or expired entry"""
+        key = self._key(query)
+        conn = self._db.get()
+        row = conn.execute(
+            "SELECT result, expires_at FROM search_cache WHERE key = ?", (key,)
+        ).fetchone()
+        now = time.time()
+        if row is None:
+            self._count("misses")
+            return None
+        result, expires_at = row
+        if expires_at <= now:
+            conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+            self._count("expired")
+            self._count("misses")
+            return None
+        conn.execute("UPDATE search_cache SET last_access = ? WHERE key = ?", (now, key))
+        self._count("hits")
+        return json.loads(result)
+
+    def set(self, query, result, ttl_seconds=None):
+        """Store a result, evicting least recently used entries beyond max_entries"""
+        now = time.time()
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        conn = self._db.get()
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO search_cache (key, query, result, created_at, expires_at, last_access)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (self._key(query), normalize_query(query), json.dumps(result), now, now + ttl, now)
+        )
+        self._evict()
+
+    def _evict(self):
+        conn = self._db.get()
+        excess = conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0] - self.max_entries
+        if excess > 0:
+            conn.execute(
+                """
+                DELETE FROM search_cache WHERE key IN (
+                    SELECT key FROM search_cache ORDER BY last_access LIMIT ?
+                )
+                """,
+                (excess,)
+            )
+            self._count("evictions", excess)
+
+    def clear(self):
+        """Remove every cached entry"""
+        self._db.get().execute("DELETE FROM search_cache")
+
+    def stats(self):
+        """Return hit/miss counters for this process plus the current entry count"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["entries"] = self._db.get().execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache():
+    """Return the process-wide search cache, or None when SEARCH_CACHE_ENABLED=0"""
+    global _search_cache
+    if config.get("SEARCH_CACHE_ENABLED", "1") == "0":
+        return None
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = SearchCache(
+                path=config.get("SEARCH_CACHE_PATH", DEFAULT_CACHE_FILE),
+                ttl_seconds=float(config.get("SEARCH_CACHE_TTL_HOURS", "168")) * 3600,
+                max_entries=int(config.get("SEARCH_CACHE_MAX_ENTRIES", "10000"))
+            )
+        return _search_cache
@@ -0,0 +1,149 @@
+import asyncio
+import copy
+import functools
+import inspect
+import threading
+
+from data_manager import get_data_manager, name_key
+from metrics import get_metrics
+
+
+def _caller():
+    """The asyncio task running this code, or the thread when there is no event loop"""
+    try:
+        return asyncio.current_task()
+    except RuntimeError:
+        return threading.get_ident()
+
+
+class _Call:
+    """One in-flight run, whose result the callers waiting for it share"""
+
+    def __init__(self, owner):
+        self.done = threading.Event()
+        self.owner = owner
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share its result
+
+    The first caller for a key runs the function. Callers arriving while it
+    runs wait for it instead of starting their own, and each gets a copy of
+    its result (or its exception). The key is free again as soon as the run
+    ends, so later calls start fresh. Sync and async callers share one
+    registry, so a thread and an event loop asking for the same key also
+    coalesce.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def _join(self, key):
+        """Return (call, leader): the in-flight call for key, and whether this caller must run it"""
+        caller = _caller()
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and call.owner != caller:
+                return call, False
+            # A re-entrant call from the running thread or task gets its own run instead of waiting on itself
+            call = _Call(caller)
+            self._calls.setdefault(key, call)
+            return call, True
+
+    def _finish(self, key, call):
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.done.set()
+
+    def _share(self, call):
+        if call.error is not None:
+            raise call.error
+        return copy.deepcopy(call.result)
+
+    def do(self, key, fn, on_join=None):
+        """Return fn(), or wait for the call already running under key
+
+        on_join() is called when this caller attaches to a running call.
+        """
+        call, leader = self._join(key)
+        if not leader:
+            if on_join:
+                on_join()
+            call.done.wait()
+            return self._share(call)
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            self._finish(key, call)
+
+    async def ado(self, key, fn, on_join=None):
+        """Async version of do; fn returns an awaitable"""
+        call, leader = self._join(key)
+        if not leader:
+            if on_join:
+                on_join()
+            # Poll instead of blocking so the event loop keeps running other lookups
+            while not call.done.is_set():
+                await asyncio.sleep(0.05)
+            return self._share(call)
+        try:
+            call.result = await fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            self._finish(key, call)
+
+
+_lookups = SingleFlight()
+
+
+def get_single_flight():
+    """Return the process-wide registry of in-flight bot lookups"""
+    return _lookups
+
+
+def lookup_key(bot, satellite_name, fields=None):
+    """(bot, canonical satellite name, requested fields): lookups with equal keys give equal results"""
+    canonical = name_key(get_data_manager().resolve_name(satellite_name))
+    return type(bot).__name__, canonical, tuple(sorted(fields)) if fields else None
+
+
+def single_flight(method):
+    """Coalesce concurrent bot.process_satellite / aprocess_satellite calls for the same lookup
+
+    The shared research corpus is only an input cache, so it is not part
+    of the key.
+    """
+    def joined(bot, satellite_name):
+        def note():
+            print(f"Joining the {type(bot).__name__} lookup already running for {satellite_name}")
+            get_metrics().increment("coalesced", type(bot).__name__, satellite_name)
+        return note
+
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def wrapper(bot, satellite_name, corpus=None, fields=None):
+            return await _lookups.ado(
+                lookup_key(bot, satellite_name, fields),
+                functools.partial(method, bot, satellite_name, corpus=corpus, fields=fields),
+                on_join=joined(bot, satellite_name)
+            )
+    else:
+        @functools.wraps(method)
+        def wrapper(bot, satellite_name, corpus=None, fields=None):
+            return _lookups.do(
+                lookup_key(bot, satellite_name, fields),
+                functools.partial(method, bot, satellite_name, corpus=corpus, fields=fields),
+                on_join=joined(bot, satellite_name)
+            )
+    return wrapper
@@ -0,0 +1,30 @@
+import sqlite3
+import threading
+
+
+class SqliteConnections:
+    """One autocommit connection per thread to a SQLite file in WAL mode
+
+    The schema script runs once, on the creating thread. functions are
+    (name, arg_count, callable) triples registered as deterministic SQL
+    functions on every connection.
+    """
+
+    def __init__(self, path, schema, functions=()):
+        self.path = path
+        self.functions = tuple(functions)
+        self._local = threading.local()
+        conn = self.get()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(schema)
+
+    def get(self):
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout = 30000")
+            for name, arg_count, function in self.functions:
+                conn.create_function(name, arg_count, function, deterministic=True)
+            self._local.conn = conn
+        return conn
@@ -0,0 +1,172 @@
+import json
+import multiprocessing
+
+import pytest
+
+from data_manager import SatelliteDataManager, SqliteStore, name_key, norad_id
+
+
+@pytest.fixture(params=["sqlite", "json"])
+def backend(request):
+    return request.param
+
+
+def open_manager(backend, tmp_path):
+    path = tmp_path / ("store.db" if backend == "sqlite" else "store.json")
+    return SatelliteDataManager(backend=backend, path=str(path), json_file=str(tmp_path / "missing.json"))
+
+
+@pytest.fixture
+def manager(backend, tmp_path):
+    return open_manager(backend, tmp_path)
+
+
+def test_name_key_ignores_case_punctuation_and_spacing():
+    assert name_key("Starlink-1") == name_key("STARLINK 1") == name_key("starlink1") == "STARLINK 1"
+    assert name_key("ISS (ZARYA)") == "ISS ZARYA"
+
+
+def test_norad_id_forms():
+    assert norad_id("25544") == norad_id("NORAD 25544") == norad_id("norad:25544") == 25544
+    assert norad_id("NORAD ID 25544") == norad_id("NORAD CAT ID 25544") == 25544
+    assert norad_id("STARLINK 1") is None
+
+
+def test_append_get_delete(manager):
+    manager.append_satellite_data("SAT A", "basic_info", {"altitude": "500"})
+    entry = manager.get_satellite_data("SAT A", "basic_info")
+    assert entry["data"] == {"altitude": "500"}
+    assert entry["last_updated"] == entry["field_updated"]["altitude"]
+    assert manager.get_all_satellites() == ["SAT A"]
+    assert manager.delete_satellite_data("SAT A") is True
+    assert manager.get_satellite_data("SAT A") is None
+    assert manager.delete_satellite_data("SAT A") is False
+
+
+def test_failed_update_leaves_no_record(manager, tmp_path):
+    def fail(entry):
+        raise ValueError("bad data")
+
+    with pytest.raises(ValueError):
+        manager.store.update_entry("SAT A", "basic_info", fail)
+    manager.append_satellite_data("SAT B", "basic_info", {"b": 1})
+    assert manager.get_all_satellites() == ["SAT B"]
+    reopened = SatelliteDataManager(backend=manager.backend, path=manager.data_file, json_file=str(tmp_path / "missing.json"))
+    assert reopened.get_all_satellites() == ["SAT B"]
+
+
+def test_field_merge_keeps_other_fields(manager):
+    manager.append_satellite_data("SAT A", "basic_info", {"altitude": "500", "orbital_life_years": "5"})
+    before = manager.get_satellite_data("SAT A", "basic_info")
+    manager.append_satellite_data("SAT A", "basic_info", {"altitude": "550", "orbital_life_years": "ignored"},
+                                  fields=["altitude"])
+    entry = manager.get_satellite_data("SAT A", "basic_info")
+    assert entry["data"] == {"altitude": "550", "orbital_life_years": "5"}
+    assert entry["field_updated"]["orbital_life_years"] == before["field_updated"]["orbital_life_years"]
+
+
+def test_other_spellings_share_a_record(manager):
+    manager.append_satellite_data("Starlink-1", "basic_info", {"altitude": "550"})
+    manager.append_satellite_data("STARLINK 1", "technical_specs", {"satellite_type": "comms"})
+    assert manager.get_all_satellites() == ["Starlink-1"]
+    assert set(manager.get_satellite_data("starlink1")) == {"basic_info", "technical_specs"}
+    assert manager.resolve_name("  starlink   1 ") == "Starlink-1"
+    # Unknown names are stored as given, with whitespace tidied
+    assert manager.resolve_name(" New   Sat ") == "New Sat"
+
+
+def test_aliases_and_norad_numbers(manager, tmp_path):
+    manager.append_satellite_data("ISS (ZARYA)", "basic_info", {"altitude": "420"})
+    manager.add_alias("iss zarya", "International Space Station")
+    manager.set_norad_id("International Space Station", 25544)
+    for name in ("International-Space-Station", "25544", "NORAD 25544", "norad:25544"):
+        assert manager.resolve_name(name) == "ISS (ZARYA)"
+        assert manager.get_satellite_data(name, "basic_info")["data"] == {"altitude": "420"}
+
+    catalog = tmp_path / "satcat.csv"
+    catalog.write_text("OBJECT_NAME,NORAD_CAT_ID\nISS (ZARYA),25544\nHUBBLE SPACE TELESCOPE,20580\nBAD,\n")
+    assert manager.import_catalog(str(catalog)) == 2
+    # Satellites not stored yet resolve to the catalog spelling
+    assert manager.resolve_name("20580") == "HUBBLE SPACE TELESCOPE"
+
+
+def test_resolution_follows_deletes(manager):
+    manager.store.upsert("sat 9", "basic_info", {"data": {}, "last_updated": "1"})
+    manager.store.upsert("SAT-9", "cost", {"data": {}, "last_updated": "2"})
+    assert manager.resolve_name("Sat 9") == "sat 9"
+    manager.store.delete("sat 9")
+    assert manager.resolve_name("Sat 9") == "SAT-9"
+    manager.store.delete("SAT-9")
+    assert manager.resolve_name("Sat 9") == "Sat 9"
+
+
+def test_merge_duplicates_keeps_newest_entry(manager):
+    manager.store.upsert("SAT 9", "basic_info", {"data": {"v": "old"}, "last_updated": "2026-01-01"})
+    manager.store.upsert("sat-9", "basic_info", {"data": {"v": "new"}, "last_updated": "2026-02-01"})
+    manager.store.upsert("sat-9", "technical_specs", {"data": {"t": 1}, "last_updated": "2026-02-01"})
+    assert manager.merge_duplicates() == ["sat-9"]
+    assert manager.get_all_satellites() == ["SAT 9"]
+    record = manager.get_satellite_data("sat 9")
+    assert record["basic_info"]["data"] == {"v": "new"}
+    assert record["technical_specs"]["data"] == {"t": 1}
+
+
+def test_sqlite_changes_since_lists_new_entries_and_deletions(tmp_path):
+    manager = open_manager("sqlite", tmp_path)
+    manager.store.upsert("SAT 1", "basic_info", {"data": {}, "last_updated": "2026-01-01"})
+    manager.store.upsert("SAT 2", "basic_info", {"data": {}, "last_updated": "2026-01-01"})
+    version = manager.version()
+    manager.store.upsert("SAT 1", "technical_specs", {"data": {}, "last_updated": "2026-02-01"})
+    manager.delete_satellite_data("SAT 2")
+    manager.delete_satellite_data("never stored")
+    assert manager.changes_since(version, "2026-01-01") == ([("SAT 1", "technical_specs", "2026-02-01")], ["SAT 2"])
+    assert manager.changes_since(manager.version(), "2026-02-01") == ([], [])
+    assert open_manager("json", tmp_path).changes_since(None, "") is None
+
+
+def test_json_to_sqlite_migration_is_idempotent(tmp_path, capsys):
+    legacy = {
+        "Starlink-1": {"basic_info": {"data": {"altitude": "550"}, "last_updated": "2025-01-01T00:00:00"}},
+        "ISS": {"technical_specs": {"data": {"type": "station"}, "last_updated": "2025-02-01T00:00:00"}},
+    }
+    json_path = tmp_path / "satellite_data.json"
+    json_path.write_text(json.dumps(legacy))
+    db_path = str(tmp_path / "satellite_data.db")
+
+    manager = SatelliteDataManager(backend="sqlite", path=db_path, json_file=str(json_path))
+    assert manager.data == legacy
+    # Migrated satellites are indexed for spelling lookups too
+    assert manager.resolve_name("STARLINK 1") == "Starlink-1"
+    # The notice goes to stderr so CLI output on stdout stays clean
+    captured = capsys.readouterr()
+    assert "Migrated 2 satellites" in captured.err and captured.out == ""
+
+    manager.append_satellite_data("ISS", "technical_specs", {"type": "updated"})
+    assert SqliteStore(db_path).migrate_from_json(str(json_path)) == 0
+    reopened = SatelliteDataManager(backend="sqlite", path=db_path, json_file=str(json_path))
+    assert reopened.get_all_satellites() == ["Starlink-1", "ISS"]
+    # A second open never overwrites newer data with the JSON snapshot
+    assert reopened.get_satellite_data("ISS", "technical_specs")["data"] == {"type": "updated"}
+
+
+def _increment(args):
+    backend, path, json_file, worker, count = args
+    manager = SatelliteDataManager(backend=backend, path=path, json_file=json_file)
+    for index in range(count):
+        manager.store.update_entry(
+            "COUNTER", "basic_info", lambda entry: {"data": {"n": ((entry or {}).get("data") or {"n": 0})["n"] + 1}}
+        )
+        manager.append_satellite_data(f"SAT {worker}-{index}", "basic_info", {"worker": worker})
+
+
+def test_concurrent_writers_across_processes(backend, tmp_path):
+    path = str(tmp_path / ("store.db" if backend == "sqlite" else "store.json"))
+    json_file = str(tmp_path / "missing.json")
+    workers, count = 4, 15
+    with multiprocessing.get_context("spawn").Pool(workers) as pool:
+        pool.map(_increment, [(backend, path, json_file, worker, count) for worker in range(workers)])
+
+    manager = SatelliteDataManager(backend=backend, path=path, json_file=json_file)
+    # No read-modify-write was lost, and no writer dropped another's satellites
+    assert manager.get_satellite_data("COUNTER", "basic_info")["data"]["n"] == workers * count
+    assert len(manager.get_all_satellites()) == workers * count + 1
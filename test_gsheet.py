@@ -0,0 +1,112 @@
+from benchmarks.fake_sheets import FakeWorksheet
+from gsheet import SheetSync, SheetUpserter, column_letter
+from rate_limiter import RateLimiter
+
+
+def upserter(rows, col_count=26):
+    worksheet = FakeWorksheet(rows, col_count=col_count)
+    # The fake has no quota, so an unlimited limiter keeps the tests instant
+    return worksheet, SheetUpserter(worksheet, rate_limiter=RateLimiter())
+
+
+def writes(worksheet):
+    return [name for name, _ in worksheet.requests if name not in ("row_values", "col_values", "get_all_values")]
+
+
+def test_column_letter():
+    assert [column_letter(index) for index in (1, 26, 27, 52, 703)] == ["A", "Z", "AA", "AZ", "AAA"]
+
+
+def test_upsert_updates_existing_row_in_place():
+    worksheet, sheet = upserter([
+        ["satellite_name", "basic_info.altitude", "notes"],
+        ["SAT 1", "500", "keep me"],
+        ["SAT 2", "600", ""],
+    ])
+    assert sheet.upsert("SAT 2", {"basic_info.altitude": "650"}) == 3
+    assert worksheet.rows[2] == ["SAT 2", "650", ""]
+    # Columns the data doesn't mention keep their cells
+    assert sheet.upsert("SAT 1", {"basic_info.altitude": 550}) == 2
+    assert worksheet.rows[1] == ["SAT 1", "550", "keep me"]
+    assert writes(worksheet) == ["update", "update"]
+    # The header and row index are read once for both upserts
+    assert [name for name, _ in worksheet.requests].count("row_values") == 1
+
+
+def test_upsert_appends_new_satellite_and_remembers_its_row():
+    worksheet, sheet = upserter([["satellite_name", "basic_info.altitude"], ["SAT 1", "500"]])
+    assert sheet.upsert("SAT 9", {"basic_info.altitude": "700"}) == 3
+    assert worksheet.rows[2] == ["SAT 9", "700"]
+    assert sheet.upsert("SAT 9", {"basic_info.altitude": "710"}) == 3
+    assert len(worksheet.rows) == 3
+    assert worksheet.rows[2] == ["SAT 9", "710"]
+    assert writes(worksheet) == ["append_row", "update"]
+
+
+def test_upsert_into_empty_sheet_writes_header():
+    worksheet, sheet = upserter([])
+    assert sheet.upsert("SAT 1", {"basic_info.altitude": "500"}) == 2
+    assert worksheet.rows == [["satellite_name", "basic_info.altitude"], ["SAT 1", "500"]]
+
+
+def test_upsert_grows_grid_for_new_columns():
+    worksheet, sheet = upserter([["satellite_name", "basic_info.altitude"], ["SAT 1", "500"]], col_count=2)
+    sheet.upsert("SAT 1", {"basic_info.altitude": "500", "launch_cost_info.launch_cost": "NA"})
+    assert worksheet.col_count == 3
+    assert worksheet.rows[0] == ["satellite_name", "basic_info.altitude", "launch_cost_info.launch_cost"]
+    assert worksheet.rows[1] == ["SAT 1", "500", "NA"]
+    # Only the new header cell is written, after the grid grew
+    assert worksheet.requests[-3:] == [("add_cols", 0), ("update", 1), ("update", 3)]
+
+
+def test_upsert_rereads_index_after_invalidate():
+    worksheet, sheet = upserter([["satellite_name", "a"], ["SAT 1", "1"]])
+    sheet.upsert("SAT 1", {"a": "2"})
+    # Another writer appends a row the cached index doesn't know about
+    worksheet.rows.append(["SAT 2", "5"])
+    sheet.invalidate()
+    assert sheet.upsert("SAT 2", {"a": "6"}) == 3
+    assert len(worksheet.rows) == 3
+
+
+def test_sync_writes_only_changes():
+    worksheet = FakeWorksheet()
+    sync = SheetSync(worksheet, rate_limiter=RateLimiter())
+    records = [
+        ("SAT 1", {"basic_info": {"data": {"altitude": "500"}, "last_updated": "2026-01-01"}}),
+        ("SAT 2", {"basic_info": {"data": {"altitude": "600"}, "last_updated": "2026-01-01"}}),
+    ]
+    summary = sync.sync(records)
+    assert summary["rows_appended"] == 2 and summary["columns_added"] == 3
+    records[1] = ("SAT 2", {"basic_info": {"data": {"altitude": "650"}, "last_updated": "2026-01-01"}})
+    worksheet.requests.clear()
+    summary = sync.sync(records)
+    assert summary == {"columns_renamed": 0, "columns_added": 0, "rows_updated": 1, "rows_appended": 0,
+                       "cells_written": 1, "write_requests": 1}
+    assert worksheet.rows[2][worksheet.rows[0].index("basic_info.altitude")] == "650"
+
+
+def test_upsert_renames_legacy_unprefixed_headers():
+    worksheet, sheet = upserter([
+        ["satellite_name", "altitude", "notes"],
+        ["SAT 1", "500", "keep me"],
+    ])
+    sheet.upsert("SAT 1", {"basic_info.altitude": "550", "basic_info.last_updated": "2026-01-01"})
+    # The old column is renamed in place rather than duplicated
+    assert worksheet.rows[0] == ["satellite_name", "basic_info.altitude", "notes", "basic_info.last_updated"]
+    assert worksheet.rows[1] == ["SAT 1", "550", "keep me", "2026-01-01"]
+    assert writes(worksheet) == ["update", "update"]
+
+
+def test_sync_renames_legacy_headers_and_keeps_their_cells():
+    worksheet = FakeWorksheet([["satellite_name", "altitude"], ["SAT 1", "500"]])
+    sync = SheetSync(worksheet, rate_limiter=RateLimiter())
+    records = [("SAT 1", {"basic_info": {"data": {"altitude": "500"}, "last_updated": "2026-01-01"}})]
+    summary = sync.sync(records)
+    assert summary["columns_renamed"] == 1 and summary["columns_added"] == 1
+    assert worksheet.rows == [
+        ["satellite_name", "basic_info.altitude", "basic_info.last_updated"],
+        ["SAT 1", "500", "2026-01-01"],
+    ]
+    # Only the timestamp was new; the existing altitude cell was already right
+    assert summary["cells_written"] == 3
@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import name_index
+from data_manager import SatelliteDataManager
+from name_index import SatelliteNameIndex, get_name_index
+
+
+def stamps(last_updated):
+    return {data_type: last_updated for data_type in ("basic_info", "technical_specs", "launch_cost_info")}
+
+
+@pytest.fixture
+def index():
+    index = SatelliteNameIndex(cutoff="2026-01-01")
+    index.update({
+        "Starlink 1": ("LEO", stamps("2026-06-01")),
+        "Starlink 2": ("LEO", stamps("2025-06-01")),
+        "GPS IIF-1": ("MEO", {"basic_info": "2026-06-01"}),
+        "Intelsat 1": ("GEO", stamps("2026-06-01")),
+    })
+    return index
+
+
+def test_search_lists_prefix_matches_first(index):
+    assert index.search("sat") == (["Intelsat 1"], 1)
+    assert index.search("s") == (["Starlink 1", "Starlink 2", "GPS IIF-1", "Intelsat 1"], 4)
+    assert index.search("", page=1, page_size=3) == (["Starlink 2"], 4)
+
+
+def test_filters_use_orbit_and_freshness(index):
+    assert index.search("", orbits={"LEO"}) == (["Starlink 1", "Starlink 2"], 2)
+    assert index.search("", freshness={"stale"}) == (["Starlink 2"], 1)
+    assert index.search("", freshness={"incomplete"}) == (["GPS IIF-1"], 1)
+
+
+def test_update_and_remove_in_place(index):
+    index.update({"Starlink 2": ("LEO", stamps("2026-07-01")), "Astra 1": ("GEO", stamps("2026-07-01"))})
+    index.remove(["Intelsat 1", "not indexed"])
+    assert index.search("", freshness={"fresh"}) == (["Astra 1", "Starlink 1", "Starlink 2"], 3)
+    assert index.search("tel") == ([], 0)
+    assert len(index) == 4
+
+
+def test_age_marks_passed_satellites_stale(index):
+    index.age("2026-06-15")
+    assert index.search("", freshness={"fresh"}) == ([], 0)
+    assert index.freshness["GPS IIF-1"] == "incomplete"
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.setattr(name_index, "_index", None)
+    return SatelliteDataManager(backend="sqlite", path=str(tmp_path / "store.db"),
+                                json_file=str(tmp_path / "missing.json"))
+
+
+def test_get_name_index_applies_changes_without_rebuilding(manager, monkeypatch):
+    manager.append_satellite_data("Starlink 1", "basic_info", {"launch_orbit_classification": "LEO"})
+    manager.append_satellite_data("Intelsat 1", "basic_info", {"launch_orbit_classification": "GEO"})
+    assert get_name_index(manager).search("") == (["Intelsat 1", "Starlink 1"], 2)
+
+    def rebuild(data_manager):
+        raise AssertionError("the index was rebuilt")
+    monkeypatch.setattr(name_index, "_build", rebuild)
+    manager.append_satellite_data("Starlink 1", "basic_info", {"launch_orbit_classification": "GTO"})
+    manager.append_satellite_data("Astra 1", "basic_info", {"launch_orbit_classification": "GEO"})
+    manager.delete_satellite_data("Intelsat 1")
+    index = get_name_index(manager)
+    assert index.search("") == (["Astra 1", "Starlink 1"], 2)
+    assert index.orbits["Starlink 1"] == "GEO"
+
+
+def test_get_name_index_rereads_survivor_of_a_merge(manager):
+    manager.store.upsert("STARLINK 1", "basic_info", {"data": {"launch_orbit_classification": "NA"},
+                                                       "last_updated": "2026-01-01T00:00:00"})
+    old = (datetime.now() - timedelta(days=1)).isoformat()
+    manager.store.upsert("Starlink-1", "basic_info", {"data": {"launch_orbit_classification": "LEO"},
+                                                       "last_updated": old})
+    manager.store.upsert("Astra 1", "basic_info", {"data": {}, "last_updated": datetime.now().isoformat()})
+    assert get_name_index(manager).orbits["STARLINK 1"] == "Unknown"
+    # The merged-in entry is older than the watermark, so only the deletion reveals it
+    assert manager.merge_duplicates() == ["Starlink-1"]
+    index = get_name_index(manager)
+    assert index.search("starlink") == (["STARLINK 1"], 1)
+    assert index.orbits["STARLINK 1"] == "LEO"
+
+
+def test_get_name_index_rebuilds_json_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(name_index, "_index", None)
+    manager = SatelliteDataManager(backend="json", path=str(tmp_path / "store.json"))
+    manager.append_satellite_data("Starlink 1", "basic_info", {})
+    assert len(get_name_index(manager)) == 1
+    manager.delete_satellite_data("Starlink 1")
+    manager.append_satellite_data("Astra 1", "basic_info", {})
+    assert get_name_index(manager).search("") == (["Astra 1"], 1)
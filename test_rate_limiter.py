@@ -0,0 +1,156 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import rate_limiter
+from rate_limiter import RateLimiter, estimate_tokens
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock)
+    return clock
+
+
+def test_disabled_limiter_never_blocks():
+    limiter = RateLimiter()
+    assert all(limiter.acquire(tokens=10 ** 9, blocking=False) for _ in range(100))
+
+
+def test_request_bucket_refills_at_its_rate(clock):
+    limiter = RateLimiter(requests_per_minute=60)
+    assert all(limiter.acquire(blocking=False) for _ in range(60))
+    assert not limiter.acquire(blocking=False)
+    assert limiter._wait_time(0) == pytest.approx(1.0)
+    clock.now += 0.5
+    assert not limiter.acquire(blocking=False)
+    clock.now += 0.5
+    assert limiter.acquire(blocking=False)
+    # A long idle period never fills the bucket past its limit
+    clock.now += 3600
+    assert all(limiter.acquire(blocking=False) for _ in range(60))
+    assert not limiter.acquire(blocking=False)
+
+
+def test_token_bucket_maths(clock):
+    limiter = RateLimiter(tokens_per_minute=600)
+    assert limiter.acquire(tokens=500, blocking=False)
+    assert limiter._tokens == pytest.approx(100)
+    assert not limiter.acquire(tokens=200, blocking=False)
+    # 100 tokens short at 10 tokens per second
+    assert limiter._wait_time(200) == pytest.approx(10.0)
+    clock.now += 10
+    assert limiter.acquire(tokens=200, blocking=False)
+    assert limiter._tokens == pytest.approx(0)
+
+
+def test_record_usage_corrects_the_estimate(clock):
+    limiter = RateLimiter(tokens_per_minute=1000)
+    assert limiter.acquire(tokens=100, blocking=False)
+    limiter.record_usage(300, 100)
+    assert limiter._tokens == pytest.approx(700)
+    limiter.record_usage(0, 200)
+    assert limiter._tokens == pytest.approx(900)
+    # Overspending leaves the bucket negative until it refills
+    limiter.record_usage(2000)
+    assert limiter._tokens == pytest.approx(-1100)
+    assert limiter._wait_time(0) == pytest.approx(66.0)
+
+
+def test_oversized_request_waits_for_a_full_bucket_only(clock):
+    limiter = RateLimiter(tokens_per_minute=1000)
+    assert limiter.acquire(tokens=5000, blocking=False)
+    assert limiter._tokens == pytest.approx(0)
+    assert limiter._wait_time(5000) == pytest.approx(60.0)
+
+
+def test_both_buckets_must_allow_a_request(clock):
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=60)
+    assert limiter.acquire(tokens=60, blocking=False)
+    assert limiter._wait_time(30) == pytest.approx(30.0)
+    assert limiter._wait_time(0) == 0
+
+
+def test_configure_resets_to_full_buckets(clock):
+    limiter = RateLimiter(requests_per_minute=1)
+    assert limiter.acquire(blocking=False)
+    assert not limiter.acquire(blocking=False)
+    limiter.configure(requests_per_minute=2)
+    assert limiter.acquire(blocking=False) and limiter.acquire(blocking=False)
+    limiter.configure()
+    assert limiter.acquire(blocking=False)
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 1
+    assert estimate_tokens("x" * 400) == 101
+
+
+def _wait_for_queue(limiter, length):
+    deadline = time.monotonic() + 5
+    while limiter._next_ticket - limiter._serving < length:
+        assert time.monotonic() < deadline, "waiter never queued"
+        time.sleep(0.001)
+
+
+def test_blocking_callers_are_served_in_arrival_order():
+    limiter = RateLimiter(requests_per_minute=6000)
+    while limiter.acquire(blocking=False):
+        pass
+    served, threads = [], []
+    for index in range(6):
+        thread = threading.Thread(target=lambda index=index: (limiter.acquire(), served.append(index)))
+        thread.start()
+        threads.append(thread)
+        _wait_for_queue(limiter, index + 1)
+    # A non-blocking caller never jumps the queue
+    assert not limiter.acquire(blocking=False)
+    for thread in threads:
+        thread.join(5)
+    assert served == list(range(6))
+
+
+def test_async_and_thread_callers_share_one_queue():
+    limiter = RateLimiter(requests_per_minute=6000)
+    while limiter.acquire(blocking=False):
+        pass
+    served = []
+    thread = threading.Thread(target=lambda: (limiter.acquire(), served.append("thread")))
+    thread.start()
+    _wait_for_queue(limiter, 1)
+
+    async def waiter():
+        await limiter.aacquire()
+        served.append("task")
+
+    asyncio.run(waiter())
+    thread.join(5)
+    assert served == ["thread", "task"]
+
+
+def test_abandoned_ticket_does_not_stall_the_queue():
+    limiter = RateLimiter(requests_per_minute=6000)
+    while limiter.acquire(blocking=False):
+        pass
+
+    async def cancelled_then_waiting():
+        task = asyncio.ensure_future(limiter.aacquire())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return await limiter.aacquire()
+
+    assert asyncio.run(cancelled_then_waiting()) is True
+    assert limiter._abandoned == set()
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import time
+
+from singleflight import SingleFlight
+
+
+def run_threads(count, target):
+    results = [None] * count
+
+    def worker(index):
+        try:
+            results[index] = target()
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return results
+
+
+def test_concurrent_threads_share_one_call():
+    flight, calls, joined = SingleFlight(), [], []
+
+    def lookup():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"altitude": "550"}
+
+    results = run_threads(5, lambda: flight.do("SAT", lookup, on_join=lambda: joined.append(1)))
+    assert len(calls) == 1 and len(joined) == 4
+    assert all(result == {"altitude": "550"} for result in results)
+    # Followers get copies, so one caller mutating its result cannot affect another
+    assert len({id(result) for result in results}) == 5
+
+
+def test_errors_are_shared_and_the_key_is_freed():
+    flight, calls = SingleFlight(), []
+
+    def failing():
+        calls.append(1)
+        time.sleep(0.2)
+        raise ValueError("search failed")
+
+    results = run_threads(3, lambda: flight.do("SAT", failing))
+    assert len(calls) == 1
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.do("SAT", lambda: "fresh") == "fresh"
+
+
+def test_different_keys_run_independently():
+    flight, calls = SingleFlight(), []
+
+    def lookup(key):
+        calls.append(key)
+        time.sleep(0.1)
+        return key
+
+    results = run_threads(2, lambda: flight.do(threading.get_ident(), lambda: lookup(threading.get_ident())))
+    assert len(calls) == 2 and sorted(results) == sorted(calls)
+
+
+def test_reentrant_call_runs_instead_of_deadlocking():
+    flight = SingleFlight()
+    assert flight.do("SAT", lambda: flight.do("SAT", lambda: "inner") + " outer") == "inner outer"
+
+
+def test_async_callers_share_one_call():
+    flight, calls = SingleFlight(), []
+
+    async def lookup():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return ["result"]
+
+    async def main():
+        return await asyncio.gather(*(flight.ado("SAT", lookup) for _ in range(4)))
+
+    assert asyncio.run(main()) == [["result"]] * 4
+    assert len(calls) == 1
+
+
+def test_async_error_is_shared():
+    flight = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.1)
+        raise RuntimeError("lookup failed")
+
+    async def main():
+        return await asyncio.gather(*(flight.ado("SAT", failing) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in asyncio.run(main()))
+
+
+def test_thread_and_event_loop_coalesce():
+    flight, calls, started = SingleFlight(), [], threading.Event()
+
+    def lookup():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return "shared"
+
+    thread = threading.Thread(target=lambda: flight.do("SAT", lookup))
+    thread.start()
+    started.wait(5)
+
+    async def lookup_async():
+        calls.append(1)
+        return "own"
+
+    assert asyncio.run(flight.ado("SAT", lookup_async)) == "shared"
+    thread.join(5)
+    assert len(calls) == 1
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import config
+
+# The trace being recorded by the current lookup, if any
+_current_trace = ContextVar("current_trace", default=None)
+
+
+def _lane():
+    """Identify the timeline a span belongs on: the asyncio task if any, else the thread"""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    if task is not None:
+        return f"task-{id(task)}", task.get_name()
+    thread = threading.current_thread()
+    return f"thread-{thread.ident}", thread.name
+
+
+class Trace:
+    """Spans of one run, exportable as Chrome trace-event JSON (chrome://tracing, Perfetto)"""
+
+    def __init__(self, name):
+        self.name = name
+        self.origin = time.perf_counter()
+        self.created_at = time.time()
+        self._lock = threading.Lock()
+        self._events = []
+        self._lanes = {}
+
+    def add(self, name, category, start, end, args=None):
+        lane, lane_name = _lane()
+        with self._lock:
+            if lane not in self._lanes:
+                self._lanes[lane] = (len(self._lanes) + 1, lane_name)
+            self._events.append({
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": round((start - self.origin) * 1e6, 3),
+                "dur": round((end - start) * 1e6, 3),
+                "pid": os.getpid(),
+                "tid": self._lanes[lane][0],
+                "args": args or {},
+            })
+
+    def to_chrome(self):
+        with self._lock:
+            events = list(self._events)
+            lanes = list(self._lanes.values())
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": lane_name}}
+            for tid, lane_name in lanes
+        ]
+        metadata.append({"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": self.name}})
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def write(self, directory):
+        """Write the trace into directory and return its path"""
+        os.makedirs(directory, exist_ok=True)
+        slug = re.sub(r"[^\w.-]+", "_", self.name).strip("_")
+        path = os.path.join(directory, f"{slug}-{int(self.created_at * 1000)}.json")
+        with open(path, "w") as f:
+            json.dump(self.to_chrome(), f)
+        return path
+
+
+@contextmanager
+def span(name, category="app", **args):
+    """Record the enclosed block as a span of the current trace; a no-op outside traced runs
+
+    Yields the span's args dict so the block can add details it learns on the way.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield args
+        return
+    start = time.perf_counter()
+    try:
+        yield args
+    except Exception as e:
+        args["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        trace.add(name, category, start, time.perf_counter(), args)
+
+
+@contextmanager
+def trace_run(name, category="run", **args):
+    """Trace the enclosed run into its own file under TRACE_DIR
+
+    Nested runs (e.g. the agent fallback of the fast path) become spans of the
+    outer trace. Without TRACE_DIR this only costs a context variable lookup.
+    """
+    trace_dir = config.get("TRACE_DIR")
+    if not trace_dir or _current_trace.get() is not None:
+        with span(name, category, **args) as details:
+            yield details
+        return
+
+    trace = Trace(name)
+    token = _current_trace.set(trace)
+    try:
+        with span(name, category, **args) as details:
+            yield details
+    finally:
+        _current_trace.reset(token)
+        try:
+            print(f"Trace written to {trace.write(trace_dir)}")
+        except OSError as e:
+            print(f"Could not write trace: {str(e)}")
+